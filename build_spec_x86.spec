@@ -25,6 +25,7 @@ a = Analysis(
         'requests_oauthlib',
         'oauthlib',
         'cryptography',
+        'nacl',
         'psutil',
         'configparser',
         'json',
@@ -34,6 +35,9 @@ a = Analysis(
         'urllib.parse',
         'secrets',
         'base64',
+        'cProfile',
+        'pstats',
+        'tracemalloc',
     ],
     hookspath=[],
     hooksconfig={},
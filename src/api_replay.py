@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+GitHub API Record/Replay
+
+Makes the GitHub traffic of the RDP Manager reproducible offline:
+
+- ``record`` runs a local proxy in front of api.github.com and github.com
+  that forwards requests and saves each exchange (status, selected headers
+  such as ETag and rate-limit values, body and latency) to a compact
+  gzipped fixture. Tokens in request headers and response bodies are not
+  stored.
+- ``serve`` replays a fixture from a local server. Repeated requests (e.g.
+  run polling) get their recorded responses in order, and each response is
+  delayed by its recorded latency times ``--scale`` (0 = no delay).
+  Timestamps in response bodies are shifted by the time elapsed since the
+  recording, so a run created during recording looks freshly created.
+- ``bench`` replays a fixture and times the OAuth, dispatch and polling
+  flows of GitHubAuth and the dispatch-to-ready flow of TailscaleRDPApp.
+
+GitHubAuth reads GITHUB_API_URL and GITHUB_SERVER_URL, so pointing those at
+the proxy or replay server (``<base>/api`` and ``<base>/web``) is enough.
+
+Usage:
+    python api_replay.py record fixture.json.gz [--port 8765]
+    python api_replay.py serve fixture.json.gz [--port 8765] [--scale 1.0]
+    python api_replay.py bench fixture.json.gz --repo owner/name [--scale 1.0]
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from github_auth import GitHubAuth, WORKFLOW_FILE
+
+
+# Path prefix on the local server -> upstream origin
+UPSTREAMS = {
+    'api': 'https://api.github.com',
+    'web': 'https://github.com'
+}
+
+# Response headers worth keeping; everything else is dropped to keep fixtures small
+KEPT_HEADERS = (
+    'content-type', 'etag', 'last-modified', 'location', 'link', 'retry-after',
+    'x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset',
+    'x-ratelimit-used', 'x-ratelimit-resource', 'x-oauth-scopes'
+)
+
+# JSON fields whose values are credentials
+REDACTED_FIELDS = ('access_token', 'refresh_token', 'token')
+
+FIXTURE_VERSION = 1
+
+# ISO 8601 timestamps as GitHub writes them, e.g. 2024-05-01T10:00:00Z
+TIMESTAMP_PATTERN = re.compile(
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$'
+)
+
+
+def _match_key(method: str, path: str, query: str) -> str:
+    """Key identifying equivalent requests, independent of query order"""
+    params = sorted(urllib.parse.parse_qsl(query, keep_blank_values=True))
+    return f"{method} {path}?{urllib.parse.urlencode(params)}"
+
+
+def _encode_body(body: bytes, content_type: str) -> Tuple[str, Any]:
+    """Store JSON as data, other text as a string and binary as base64"""
+    if not body:
+        return 'text', ''
+    if 'json' in content_type:
+        try:
+            data = json.loads(body)
+            if isinstance(data, dict):
+                for field in REDACTED_FIELDS:
+                    if field in data:
+                        data[field] = 'REDACTED'
+            return 'json', data
+        except ValueError:
+            pass
+    try:
+        return 'text', body.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'base64', base64.b64encode(body).decode('ascii')
+
+
+def _decode_body(encoding: str, body: Any) -> bytes:
+    if encoding == 'json':
+        return json.dumps(body, separators=(',', ':')).encode('utf-8')
+    if encoding == 'base64':
+        return base64.b64decode(body)
+    return body.encode('utf-8')
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse a GitHub timestamp string, or return None for any other string"""
+    if not TIMESTAMP_PATTERN.match(value):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _format_timestamp(moment: datetime, like: str) -> str:
+    """Format a timestamp in the style of the recorded value"""
+    if like.endswith('Z'):
+        moment = moment.astimezone(timezone.utc)
+        text = moment.strftime('%Y-%m-%dT%H:%M:%S')
+        if '.' in like:
+            text += f".{moment.microsecond // 1000:03d}"
+        return text + 'Z'
+    return moment.isoformat(timespec='milliseconds' if '.' in like else 'seconds')
+
+
+def shift_timestamps(data: Any, seconds: float) -> Any:
+    """Return JSON data with every timestamp string moved by ``seconds``"""
+    if isinstance(data, dict):
+        return {key: shift_timestamps(value, seconds) for key, value in data.items()}
+    if isinstance(data, list):
+        return [shift_timestamps(value, seconds) for value in data]
+    if isinstance(data, str):
+        moment = _parse_timestamp(data)
+        if moment is not None:
+            return _format_timestamp(moment + timedelta(seconds=seconds), data)
+    return data
+
+
+def _latest_timestamp(exchanges: List[Dict[str, Any]]) -> Optional[float]:
+    """Newest run activity in the recorded bodies (for fixtures without recorded_at)"""
+    latest = None
+    stack = [e['body'] for e in exchanges if e.get('encoding') == 'json']
+    while stack:
+        data = stack.pop()
+        if isinstance(data, list):
+            stack.extend(data)
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                if key in ('created_at', 'updated_at') and isinstance(value, str):
+                    moment = _parse_timestamp(value)
+                    if moment is not None:
+                        latest = max(latest or 0.0, moment.timestamp())
+                else:
+                    stack.append(value)
+    return latest
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    """
+    Read a fixture file
+
+    Returns:
+        Dictionary with 'exchanges' and 'recorded_at' (Unix time the
+        recording started, or None if unknown)
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as fixture_file:
+        fixture = json.load(fixture_file)
+    if fixture.get('version') != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version in {path}")
+    if fixture.get('recorded_at') is None:
+        fixture['recorded_at'] = _latest_timestamp(fixture['exchanges'])
+    return fixture
+
+
+def save_fixture(path: str, exchanges: List[Dict[str, Any]], recorded_at: float = None):
+    """Write exchanges to a gzipped fixture file"""
+    with gzip.open(path, 'wt', encoding='utf-8') as fixture_file:
+        json.dump({'version': FIXTURE_VERSION, 'recorded_at': recorded_at,
+                   'exchanges': exchanges},
+                  fixture_file, separators=(',', ':'))
+
+
+def _split_upstream(path: str) -> Tuple[Optional[str], str, str]:
+    """Split '/api/repos/...?...' into (prefix, upstream path, query)"""
+    parts = urllib.parse.urlsplit(path)
+    prefix, _, rest = parts.path.lstrip('/').partition('/')
+    if prefix not in UPSTREAMS:
+        return None, parts.path, parts.query
+    return prefix, '/' + rest, parts.query
+
+
+class _BaseHandler(BaseHTTPRequestHandler):
+    """Shared response helper"""
+
+    def _respond(self, status: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_PATCH(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        """Suppress default logging"""
+        pass
+
+
+class _RecordingHandler(_BaseHandler):
+    """Forward a request upstream and record the exchange"""
+
+    def _handle(self):
+        prefix, path, query = _split_upstream(self.path)
+        if prefix is None:
+            self._respond(404, {'Content-Type': 'text/plain'}, b'Unknown upstream prefix')
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request_body = self.rfile.read(length) if length else None
+        forward_headers = {
+            name: value for name, value in self.headers.items()
+            if name.lower() not in ('host', 'content-length', 'accept-encoding', 'connection')
+        }
+
+        url = UPSTREAMS[prefix] + path + (f'?{query}' if query else '')
+        started = time.perf_counter()
+        try:
+            response = self.server.session.request(
+                self.command, url, data=request_body, headers=forward_headers,
+                allow_redirects=False, timeout=60
+            )
+        except requests.RequestException as e:
+            self._respond(502, {'Content-Type': 'text/plain'}, str(e).encode())
+            return
+        latency = time.perf_counter() - started
+
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() in KEPT_HEADERS
+        }
+        encoding, body = _encode_body(response.content, headers.get('Content-Type', ''))
+        self.server.record({
+            'key': _match_key(self.command, f'/{prefix}{path}', query),
+            'status': response.status_code,
+            'headers': headers,
+            'encoding': encoding,
+            'body': body,
+            'latency': round(latency, 4)
+        })
+
+        self._respond(response.status_code, headers, response.content)
+
+
+class RecordingProxy(ThreadingHTTPServer):
+    """Local proxy recording GitHub exchanges"""
+
+    daemon_threads = True
+
+    def __init__(self, fixture_path: str, port: int = 0):
+        super().__init__(('127.0.0.1', port), _RecordingHandler)
+        self.fixture_path = fixture_path
+        self.exchanges: List[Dict[str, Any]] = []
+        self.recorded_at = time.time()
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def record(self, exchange: Dict[str, Any]):
+        with self._lock:
+            self.exchanges.append(exchange)
+
+    def save(self):
+        """Write everything recorded so far"""
+        with self._lock:
+            save_fixture(self.fixture_path, list(self.exchanges), self.recorded_at)
+
+
+class _ReplayHandler(_BaseHandler):
+    """Serve the next recorded response for a request"""
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+
+        prefix, path, query = _split_upstream(self.path)
+        exchange = self.server.next_exchange(_match_key(self.command, f'/{prefix}{path}', query))
+        if exchange is None:
+            body = json.dumps({'message': 'No recorded exchange'}).encode()
+            self._respond(404, {'Content-Type': 'application/json'}, body)
+            return
+
+        if self.server.scale:
+            time.sleep(exchange['latency'] * self.server.scale)
+
+        headers = {
+            name: self.server.rewrite(value) for name, value in exchange['headers'].items()
+        }
+        body = exchange['body']
+        if exchange['encoding'] == 'json' and self.server.shift:
+            body = shift_timestamps(body, self.server.shift)
+        self._respond(exchange['status'], headers, _decode_body(exchange['encoding'], body))
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local server replaying a fixture"""
+
+    daemon_threads = True
+
+    def __init__(self, fixture: Dict[str, Any], port: int = 0, scale: float = 1.0):
+        """
+        Initialize replay
+
+        Args:
+            fixture: Output of load_fixture
+            port: Local port (0 picks a free one)
+            scale: Multiplier for recorded latencies (0 disables delays)
+        """
+        super().__init__(('127.0.0.1', port), _ReplayHandler)
+        self.scale = scale
+        self.recorded_at = fixture.get('recorded_at')
+        # Seconds added to recorded timestamps; re-anchored by reset()
+        self.shift = 0.0
+        self.misses: List[str] = []
+        self._sequences: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for exchange in fixture['exchanges']:
+            self._sequences.setdefault(exchange['key'], []).append(exchange)
+        self.reset()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def next_exchange(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return recorded responses in order, repeating the last one"""
+        with self._lock:
+            sequence = self._sequences.get(key)
+            if not sequence:
+                self.misses.append(key)
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return sequence[min(cursor, len(sequence) - 1)]
+
+    def rewrite(self, value: str) -> str:
+        """Point absolute upstream URLs in headers back at this server"""
+        for prefix, origin in UPSTREAMS.items():
+            value = value.replace(origin, f"{self.base_url}/{prefix}")
+        return value
+
+    def reset(self):
+        """Start every request sequence from the beginning again, as of now"""
+        with self._lock:
+            self._cursors.clear()
+            self.misses.clear()
+            if self.recorded_at is not None:
+                self.shift = time.time() - self.recorded_at
+
+
+def start_server(server: ThreadingHTTPServer) -> threading.Thread:
+    """Run a server on a daemon thread"""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def point_environment_at(base_url: str):
+    """Make new GitHubAuth instances talk to a local proxy or replay server"""
+    os.environ['GITHUB_API_URL'] = f"{base_url}/api"
+    os.environ['GITHUB_SERVER_URL'] = f"{base_url}/web"
+
+
+def _summarize(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    if not ordered:
+        return "no samples"
+    median = ordered[len(ordered) // 2]
+    return f"median {median * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms, n={len(ordered)}"
+
+
+def bench_auth(server: ReplayServer, owner: str, repo: str,
+               iterations: int = 5) -> Dict[str, List[float]]:
+    """
+    Time GitHubAuth flows against a replay server
+
+    Returns:
+        Flow name -> durations in seconds
+    """
+    timings: Dict[str, List[float]] = {'oauth': [], 'dispatch': [], 'poll': []}
+
+    for _ in range(iterations):
+        server.reset()
+        auth = GitHubAuth()
+
+        started = time.perf_counter()
+        try:
+            auth.start_oauth_flow()
+            # Stand in for the browser following GitHub's redirect
+            urllib.request.urlopen(f"{auth.redirect_uri}?code=replay", timeout=5).read()
+            code = auth.wait_for_callback(timeout=10)
+        except Exception:
+            code = 'replay'  # Callback port busy; time the exchange alone
+            auth.logout()
+        if auth.exchange_code_for_token(code):
+            auth.get_user_info()
+        timings['oauth'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        auth.trigger_workflow(owner, repo, WORKFLOW_FILE, {})
+        timings['dispatch'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        auth.get_workflow_runs(owner, repo)
+        timings['poll'].append(time.perf_counter() - started)
+
+    return timings
+
+
+def bench_app(server: ReplayServer, full_repo: str, timeout: float = 60.0) -> Dict[str, float]:
+    """
+    Time TailscaleRDPApp from Start RDP Session until the runner is up
+
+    Runs the real app offscreen with a throwaway home directory.
+
+    Returns:
+        'dispatch_to_ready' seconds (-1 on timeout) and event-loop lag figures
+    """
+    server.reset()
+    home = tempfile.mkdtemp(prefix='rdp-replay-')
+    saved_env = {name: os.environ.get(name) for name in ('HOME', 'USERPROFILE')}
+    os.environ['HOME'] = os.environ['USERPROFILE'] = home
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from main_app import TailscaleRDPApp
+    from profiling import EventLoopLagMonitor
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = TailscaleRDPApp()
+    window.github_token = window.github_auth.access_token = 'replay'
+    window.tailscale_key = 'tskey-replay'
+    window.repo_input.setText(full_repo)
+
+    lag_monitor = EventLoopLagMonitor(20)
+    result = {'dispatch_to_ready': -1.0}
+    started = time.perf_counter()
+
+    def check():
+        if any(m.last_status == 'in_progress' for m in window.workflow_monitors.values()):
+            result['dispatch_to_ready'] = time.perf_counter() - started
+            app.quit()
+        elif time.perf_counter() - started > timeout:
+            app.quit()
+
+    poll = QTimer()
+    poll.setInterval(10)
+    poll.timeout.connect(check)
+    poll.start()
+    lag_monitor.start()
+    window.start_rdp_session()
+    app.exec_()
+
+    lag_monitor.stop()
+    poll.stop()
+    for monitor in window.workflow_monitors.values():
+        monitor.stop()
+    window.task_runner.cancel_all()
+    window.task_runner.wait_for_done(5000)
+    for timer in (window.save_timer, window.queue_timer, window.info_timer):
+        timer.stop()
+    if window.tray_icon:
+        window.tray_icon.hide()
+    window.deleteLater()
+
+    for name, value in saved_env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    shutil.rmtree(home, ignore_errors=True)
+
+    lags = sorted(lag for _, lag in lag_monitor.samples) or [0.0]
+    result['max_lag_ms'] = lags[-1]
+    result['p95_lag_ms'] = lags[int(0.95 * (len(lags) - 1))]
+    return result
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Record and replay GitHub API traffic")
+    parser.add_argument('mode', choices=('record', 'serve', 'bench'))
+    parser.add_argument('fixture', help="Fixture file (.json.gz)")
+    parser.add_argument('--port', type=int, default=8765, help="Local port for record/serve")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Latency multiplier for replay (0 = no delay)")
+    parser.add_argument('--repo', help="Repository (owner/name) used by bench")
+    parser.add_argument('--iterations', type=int, default=5, help="Bench iterations")
+    parser.add_argument('--max-ready', type=float,
+                        help="Fail bench if dispatch-to-ready takes longer (seconds)")
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        proxy = RecordingProxy(args.fixture, args.port)
+        print(f"Recording to {args.fixture}. Start the app with:")
+        print(f"  GITHUB_API_URL={proxy.base_url}/api GITHUB_SERVER_URL={proxy.base_url}/web")
+        print("Press Ctrl+C to stop and save.")
+        try:
+            proxy.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        proxy.save()
+        print(f"Saved {len(proxy.exchanges)} exchanges")
+        return
+
+    server = ReplayServer(load_fixture(args.fixture), args.port if args.mode == 'serve' else 0,
+                          args.scale)
+
+    if args.mode == 'serve':
+        print(f"Replaying {args.fixture} on {server.base_url} (scale {args.scale})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not args.repo or '/' not in args.repo:
+        parser.error("bench needs --repo owner/name")
+
+    start_server(server)
+    point_environment_at(server.base_url)
+    owner, repo = args.repo.split('/', 1)
+
+    for flow, samples in bench_auth(server, owner, repo, args.iterations).items():
+        print(f"GitHubAuth {flow:<9} {_summarize(samples)}")
+
+    app_result = bench_app(server, args.repo)
+    ready = app_result['dispatch_to_ready']
+    print(
+        f"TailscaleRDPApp dispatch-to-ready "
+        f"{f'{ready:.2f} s' if ready >= 0 else 'timed out'}, "
+        f"event-loop lag p95 {app_result['p95_lag_ms']:.1f} ms, "
+        f"max {app_result['max_lag_ms']:.1f} ms"
+    )
+
+    misses = list(server.misses)
+    if misses:
+        print(f"{len(misses)} requests had no recorded exchange, e.g. {misses[0]}")
+    server.shutdown()
+
+    if ready < 0:
+        print("FAIL: the session never became ready")
+        sys.exit(1)
+    if args.max_ready is not None and ready > args.max_ready:
+        print(f"FAIL: dispatch-to-ready over the {args.max_ready} s budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
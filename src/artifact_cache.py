@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Workflow Artifact Cache
+
+Downloads run artifacts and logs from GitHub Actions into a size-bounded,
+content-addressed cache on disk:
+
+- downloads are streamed to a partial file and resumed with ``Range`` if
+  interrupted, so an archive is never held in memory; ``If-Range`` makes
+  sure the bytes appended belong to the same archive
+- finished archives are stored under their SHA-256 digest; identical
+  archives are stored once
+- zip members are read or extracted straight from the cached file
+- the index maps (repo, run, artifact) to a digest, so re-opening a past
+  session's logs needs no network I/O
+- the connection info artifact holds the RDP password in plain text, so it
+  is deleted as soon as it has been read and never enters the index
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import zipfile
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from github_app_auth import GitHubAppAuthError
+from github_auth import GitHubAuth
+
+
+INFO_ARTIFACT = 'tailscale-rdp-info'
+INFO_MEMBER = 'tailscale_rdp_info.txt'
+
+CHUNK_SIZE = 64 * 1024
+
+
+def default_cache_dir() -> str:
+    """Location of the artifact cache in the user's home directory"""
+    return os.path.join(os.path.expanduser('~'), '.windows11-rdp-manager', 'artifacts')
+
+
+class ArtifactCache:
+    """Content-addressed on-disk cache of run artifacts and logs"""
+
+    def __init__(self, auth: GitHubAuth, cache_dir: str = None,
+                 max_bytes: int = 500 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            auth: GitHubAuth used for API requests
+            cache_dir: Cache root (defaults to ~/.windows11-rdp-manager/artifacts)
+            max_bytes: Size limit; least recently used archives are evicted
+        """
+        self.auth = auth
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self._lock = Lock()
+
+        # "repo#run_id#name" -> digest, and digest -> {'size', 'accessed'}
+        self._entries: Dict[str, str] = {}
+        self._objects: Dict[str, Dict[str, float]] = {}
+        self._load_index()
+
+        self.session = requests.Session()
+
+    def _load_index(self):
+        """Read the index, dropping entries whose archive is missing"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+
+        self._objects = {
+            digest: info for digest, info in index.get('objects', {}).items()
+            if os.path.exists(self._object_path(digest))
+        }
+        self._entries = {
+            key: digest for key, digest in index.get('entries', {}).items()
+            if digest in self._objects
+        }
+
+        # Older versions cached the connection info artifact; purge it
+        suffix = f"#{INFO_ARTIFACT}"
+        for digest in {d for key, d in self._entries.items() if key.endswith(suffix)}:
+            self._discard(digest)
+
+    def _save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as index_file:
+                json.dump({'entries': self._entries, 'objects': self._objects}, index_file)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Failed to save artifact index: {e}")
+
+    def _object_path(self, digest: str) -> str:
+        """Path of a cached archive"""
+        return os.path.join(self.cache_dir, 'objects', digest[:2], f"{digest}.zip")
+
+    @staticmethod
+    def _key(repo: str, run_id: int, name: str) -> str:
+        return f"{repo}#{run_id}#{name}"
+
+    def lookup(self, repo: str, run_id: int, name: str) -> Optional[str]:
+        """
+        Find a cached archive without touching the network
+
+        Returns:
+            Path of the archive or None if it is not cached
+        """
+        with self._lock:
+            digest = self._entries.get(self._key(repo, run_id, name))
+            if digest is None:
+                return None
+            self._objects[digest]['accessed'] = time.time()
+            return self._object_path(digest)
+
+    def list_artifacts(self, repo: str, run_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        List the artifacts of a run
+
+        Args:
+            repo: Repository as owner/name
+            run_id: Workflow run ID
+
+        Returns:
+            List of artifacts or None if failed
+        """
+        url = f'{self.auth.api_url}/repos/{repo}/actions/runs/{run_id}/artifacts'
+        try:
+            response = self.session.get(url, headers=self.auth.api_headers(), timeout=30)
+            if response.status_code == 200:
+                return response.json().get('artifacts', [])
+            return None
+        except (requests.RequestException, GitHubAppAuthError):
+            return None
+
+    @staticmethod
+    def _validator(response: requests.Response) -> Optional[str]:
+        """Strong ETag or Last-Modified usable in If-Range, if the server sent one"""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    def _download(self, url: str, partial_name: str, resume: bool = True) -> Optional[str]:
+        """
+        Stream a download into the object store, resuming a partial file
+
+        A partial file is only resumed when the validator recorded with it
+        is sent back in ``If-Range``; if the resource changed the server
+        answers with the full body and the download starts over.
+
+        Args:
+            url: Download URL
+            partial_name: File name of the partial download
+            resume: Whether an existing partial file may be resumed
+
+        Returns:
+            Digest of the stored archive or None if the download failed
+        """
+        partial_dir = os.path.join(self.cache_dir, 'partial')
+        os.makedirs(partial_dir, exist_ok=True)
+        partial_path = os.path.join(partial_dir, partial_name)
+        validator_path = partial_path + '.validator'
+
+        validator = None
+        if resume:
+            try:
+                with open(validator_path, 'r', encoding='utf-8') as validator_file:
+                    validator = validator_file.read().strip() or None
+            except OSError:
+                pass
+        if validator is None:
+            # Without a validator the partial bytes cannot be trusted
+            for path in (partial_path, validator_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(partial_path):
+            with open(partial_path, 'rb') as partial:
+                for chunk in iter(lambda: partial.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+
+        try:
+            headers = self.auth.api_headers()
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+
+            # The API answers with a redirect to blob storage; requests drops
+            # the Authorization header there but keeps Range
+            with self.session.get(url, headers=headers, stream=True, timeout=60) as response:
+                if response.status_code == 416 and offset:
+                    pass  # Partial file already holds the whole archive
+                elif response.status_code in (200, 206):
+                    if response.status_code == 200 and offset:
+                        # Server ignored the range or the archive changed; start over
+                        digest = hashlib.sha256()
+                        offset = 0
+                    if not offset:
+                        new_validator = self._validator(response)
+                        if resume and new_validator:
+                            with open(validator_path, 'w', encoding='utf-8') as validator_file:
+                                validator_file.write(new_validator)
+                        elif os.path.exists(validator_path):
+                            os.remove(validator_path)
+                    with open(partial_path, 'ab' if offset else 'wb') as partial:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            partial.write(chunk)
+                            digest.update(chunk)
+                else:
+                    return None
+        except (requests.RequestException, GitHubAppAuthError, OSError) as e:
+            # Keep the partial file so the next attempt resumes
+            print(f"Download interrupted: {e}")
+            return None
+
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+        if not zipfile.is_zipfile(partial_path):
+            os.remove(partial_path)
+            return None
+
+        size = os.path.getsize(partial_path)
+
+        hex_digest = digest.hexdigest()
+        object_path = self._object_path(hex_digest)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path):
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, object_path)
+
+        with self._lock:
+            self._objects[hex_digest] = {'size': size, 'accessed': time.time()}
+        return hex_digest
+
+    def _store(self, key: str, digest: str):
+        """Record an entry, evict over-limit archives and save the index"""
+        with self._lock:
+            self._entries[key] = digest
+            self._evict()
+            self._save_index()
+
+    def _discard(self, digest: str):
+        """Delete an archive and every entry pointing to it"""
+        with self._lock:
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            shutil.rmtree(self._extract_dir(digest), ignore_errors=True)
+            self._objects.pop(digest, None)
+            self._entries = {k: d for k, d in self._entries.items() if d != digest}
+            self._save_index()
+
+    def _evict(self):
+        """Remove least recently used archives above the limit (caller holds the lock)"""
+        total = sum(info['size'] for info in self._objects.values())
+        for digest, info in sorted(self._objects.items(), key=lambda item: item[1]['accessed']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            shutil.rmtree(self._extract_dir(digest), ignore_errors=True)
+            total -= info['size']
+            del self._objects[digest]
+            self._entries = {k: d for k, d in self._entries.items() if d != digest}
+
+    def _find_artifact(self, repo: str, run_id: int, name: str) -> Optional[Dict[str, Any]]:
+        """Find an unexpired artifact of a run by name"""
+        artifacts = self.list_artifacts(repo, run_id) or []
+        return next((a for a in artifacts if a.get('name') == name and not a.get('expired')), None)
+
+    def fetch_artifact(self, repo: str, run_id: int, name: str) -> Optional[str]:
+        """
+        Get an artifact archive, downloading it only if it is not cached
+
+        Args:
+            repo: Repository as owner/name
+            run_id: Workflow run ID
+            name: Artifact name
+
+        Returns:
+            Path of the cached zip or None if unavailable
+        """
+        cached = self.lookup(repo, run_id, name)
+        if cached:
+            return cached
+
+        artifact = self._find_artifact(repo, run_id, name)
+        if artifact is None:
+            return None
+
+        digest = self._download(
+            artifact['archive_download_url'], f"artifact-{artifact['id']}.part"
+        )
+        if digest is None:
+            return None
+
+        self._store(self._key(repo, run_id, name), digest)
+        return self._object_path(digest)
+
+    def fetch_logs(self, repo: str, run_id: int, completed: bool = True) -> Optional[str]:
+        """
+        Get the log archive of a run
+
+        Logs of unfinished runs keep growing, so they are only cached once
+        the run has completed.
+
+        Args:
+            repo: Repository as owner/name
+            run_id: Workflow run ID
+            completed: Whether the run has finished
+
+        Returns:
+            Path of the zip or None if unavailable
+        """
+        if completed:
+            cached = self.lookup(repo, run_id, 'logs')
+            if cached:
+                return cached
+
+        url = f'{self.auth.api_url}/repos/{repo}/actions/runs/{run_id}/logs'
+        # Logs of a running job are regenerated between requests, so a
+        # partial download of them is never resumed
+        digest = self._download(url, f"logs-{run_id}.part", resume=completed)
+        if digest is None:
+            return None
+
+        if completed:
+            self._store(self._key(repo, run_id, 'logs'), digest)
+        else:
+            with self._lock:
+                self._evict()
+                self._save_index()
+        return self._object_path(digest)
+
+    @staticmethod
+    def read_member(archive_path: str, member: str, max_bytes: int = 1024 * 1024) -> Optional[bytes]:
+        """
+        Read one small member from a cached zip without extracting the rest
+
+        Args:
+            archive_path: Path returned by fetch_artifact or fetch_logs
+            member: Name of the file inside the zip
+            max_bytes: Refuse members larger than this
+
+        Returns:
+            Member contents or None if missing or too large
+        """
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                info = archive.getinfo(member)
+                if info.file_size > max_bytes:
+                    return None
+                with archive.open(info) as member_file:
+                    return member_file.read()
+        except (KeyError, OSError, zipfile.BadZipFile):
+            return None
+
+    def _extract_dir(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'extracted', digest)
+
+    def extract(self, archive_path: str, members: Iterable[str] = None) -> Optional[str]:
+        """
+        Extract members of a cached zip next to the cache, streaming each file
+
+        Extraction is skipped when it was already done for this archive.
+
+        Args:
+            archive_path: Path returned by fetch_artifact or fetch_logs
+            members: Names to extract (defaults to all)
+
+        Returns:
+            Directory containing the extracted files, or None on failure
+        """
+        digest = os.path.splitext(os.path.basename(archive_path))[0]
+        target = self._extract_dir(digest)
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if members is not None and info.filename not in members:
+                        continue
+                    if info.is_dir():
+                        continue
+                    destination = os.path.realpath(os.path.join(target, info.filename))
+                    if not destination.startswith(os.path.realpath(target) + os.sep):
+                        continue  # Skip entries escaping the target directory
+                    if os.path.exists(destination):
+                        continue
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    with archive.open(info) as source, open(destination, 'wb') as out:
+                        shutil.copyfileobj(source, out, CHUNK_SIZE)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"Failed to extract {archive_path}: {e}")
+            return None
+        return target
+
+    def connection_info(self, repo: str, run_id: int) -> Optional[str]:
+        """
+        Read tailscale_rdp_info.txt of a run
+
+        The file contains the RDP password, so the archive is downloaded
+        without resume support and deleted again once it has been read.
+
+        Returns:
+            Connection info text or None if the artifact is not available yet
+        """
+        artifact = self._find_artifact(repo, run_id, INFO_ARTIFACT)
+        if artifact is None:
+            return None
+
+        partial_name = f"artifact-{artifact['id']}.part"
+        digest = self._download(artifact['archive_download_url'], partial_name, resume=False)
+        if digest is None:
+            partial_path = os.path.join(self.cache_dir, 'partial', partial_name)
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+
+        try:
+            data = self.read_member(self._object_path(digest), INFO_MEMBER)
+        finally:
+            self._discard(digest)
+        if data is None:
+            return None
+        # PowerShell's Out-File -Encoding UTF8 writes a byte order mark
+        return data.decode('utf-8-sig').strip()
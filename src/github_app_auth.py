@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+GitHub App Authentication Module
+
+Authenticates the Windows 11 RDP Manager as a GitHub App instead of an
+OAuth user. The app JWT is signed locally with the app's private key and
+exchanged for per-installation access tokens, which lets unattended servers
+run without the interactive web flow and use installation rate limits.
+
+Both the JWT and the installation tokens are cached. A background refresher
+re-mints them before they expire, so callers of ``get_token`` normally get
+a cached token without a network round trip.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import base64
+import json
+import os
+import time
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from github_auth import parse_timestamp
+
+
+# GitHub rejects app JWTs valid for more than 10 minutes
+JWT_LIFETIME = 540
+# Allowance for clock drift between this machine and GitHub
+JWT_CLOCK_SKEW = 60
+
+
+class GitHubAppAuthError(Exception):
+    """Raised when a JWT or installation token cannot be obtained"""
+
+
+def _b64url(data: bytes) -> str:
+    """Base64url-encode without padding, as required by JWT"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class GitHubAppAuth:
+    """GitHub App JWT and installation token manager"""
+
+    def __init__(self, app_id: str, private_key_pem: bytes,
+                 api_url: str = "https://api.github.com",
+                 refresh_margin: int = 600):
+        """
+        Initialize GitHub App authentication
+
+        Args:
+            app_id: Numeric GitHub App ID
+            private_key_pem: PEM-encoded private key downloaded from the app settings
+            api_url: GitHub API base URL (override to point at a local stub)
+            refresh_margin: Seconds before expiry at which tokens are re-minted
+        """
+        self.app_id = str(app_id)
+        self.api_url = api_url.rstrip('/')
+        self.refresh_margin = refresh_margin
+        self._private_key = serialization.load_pem_private_key(
+            private_key_pem, password=None
+        )
+
+        # Cached credentials: (value, expires_at)
+        self._jwt: Optional[Tuple[str, float]] = None
+        self._tokens: Dict[int, Tuple[str, float]] = {}
+        self._lock = Lock()
+        # One lock per installation, so concurrent callers share one mint
+        self._mint_locks: Dict[int, Lock] = {}
+
+        # Background refresher state
+        self._refresh_thread: Optional[Thread] = None
+        self._stop_event = Event()
+        self._wake_event = Event()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'Windows-11-RDP-Manager/1.0'
+        })
+
+    @classmethod
+    def from_environment(cls) -> Optional['GitHubAppAuth']:
+        """
+        Create an instance from GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH
+
+        Returns:
+            Configured GitHubAppAuth or None if the variables are not set
+        """
+        app_id = os.environ.get('GITHUB_APP_ID')
+        key_path = os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')
+        if not app_id or not key_path:
+            return None
+
+        with open(key_path, 'rb') as key_file:
+            private_key_pem = key_file.read()
+
+        api_url = os.environ.get('GITHUB_API_URL', "https://api.github.com")
+        return cls(app_id, private_key_pem, api_url=api_url)
+
+    def get_jwt(self) -> str:
+        """
+        Get a signed app JWT, reusing the cached one while it is fresh
+
+        Returns:
+            Encoded JWT suitable for a Bearer Authorization header
+        """
+        with self._lock:
+            now = time.time()
+            if self._jwt and self._jwt[1] - now > JWT_CLOCK_SKEW:
+                return self._jwt[0]
+
+            token, expires_at = self._sign_jwt(now)
+            self._jwt = (token, expires_at)
+            return token
+
+    def _sign_jwt(self, now: float) -> Tuple[str, float]:
+        """Sign a new RS256 app JWT"""
+        issued_at = int(now) - JWT_CLOCK_SKEW
+        expires_at = int(now) + JWT_LIFETIME
+
+        header = {'alg': 'RS256', 'typ': 'JWT'}
+        payload = {'iat': issued_at, 'exp': expires_at, 'iss': self.app_id}
+
+        signing_input = (
+            _b64url(json.dumps(header, separators=(',', ':')).encode()) + '.' +
+            _b64url(json.dumps(payload, separators=(',', ':')).encode())
+        )
+        signature = self._private_key.sign(
+            signing_input.encode('ascii'),
+            padding.PKCS1v15(),
+            hashes.SHA256()
+        )
+
+        return f"{signing_input}.{_b64url(signature)}", float(expires_at)
+
+    def get_token(self, installation_id: int) -> str:
+        """
+        Get an installation access token
+
+        Returns the cached token when it is still valid. A synchronous
+        exchange only happens on first use or if the background refresher
+        could not keep the token fresh.
+
+        Args:
+            installation_id: GitHub App installation ID
+
+        Returns:
+            Installation access token
+        """
+        cached = self._cached_token(installation_id)
+        if cached:
+            return cached
+
+        with self._mint_lock(installation_id):
+            # Another thread may have minted while this one waited
+            cached = self._cached_token(installation_id)
+            if cached:
+                return cached
+            return self._mint_token(installation_id)
+
+    def _cached_token(self, installation_id: int) -> Optional[str]:
+        """Return the cached token of an installation if it is still valid"""
+        with self._lock:
+            cached = self._tokens.get(installation_id)
+        if cached and cached[1] - time.time() > JWT_CLOCK_SKEW:
+            return cached[0]
+        return None
+
+    def _mint_lock(self, installation_id: int) -> Lock:
+        """Return the lock serializing token minting for an installation"""
+        with self._lock:
+            return self._mint_locks.setdefault(installation_id, Lock())
+
+    def _mint_token(self, installation_id: int) -> str:
+        """Exchange the app JWT for a new installation token"""
+        url = f"{self.api_url}/app/installations/{installation_id}/access_tokens"
+        headers = {'Authorization': f'Bearer {self.get_jwt()}'}
+
+        try:
+            response = self.session.post(url, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            raise GitHubAppAuthError(f"Installation token request failed: {e}")
+
+        if response.status_code != 201:
+            raise GitHubAppAuthError(
+                f"HTTP error during installation token exchange: {response.status_code}"
+            )
+
+        try:
+            token_info = response.json()
+            token = token_info['token']
+            expires_at = parse_timestamp(token_info['expires_at'])
+        except (ValueError, KeyError, TypeError) as e:
+            raise GitHubAppAuthError(f"Unexpected installation token response: {e!r}")
+        if expires_at is None:
+            raise GitHubAppAuthError(
+                f"Unexpected installation token expiry: {token_info['expires_at']!r}"
+            )
+
+        with self._lock:
+            self._tokens[installation_id] = (token, expires_at)
+
+        # New expiry may be earlier than the refresher's current deadline
+        self._wake_event.set()
+        return token
+
+    def find_installation(self, owner: str, repo: str) -> Optional[int]:
+        """
+        Look up the installation ID of this app on a repository
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+
+        Returns:
+            Installation ID or None if the app is not installed there
+        """
+        url = f"{self.api_url}/repos/{owner}/{repo}/installation"
+        headers = {'Authorization': f'Bearer {self.get_jwt()}'}
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=30)
+            if response.status_code == 200:
+                return response.json().get('id')
+            return None
+        except requests.RequestException:
+            return None
+
+    def warm(self, installation_ids: Iterable[int]):
+        """
+        Mint tokens ahead of time so the first request does not pay for it
+
+        Args:
+            installation_ids: Installations the caller is going to use
+        """
+        for installation_id in installation_ids:
+            self.get_token(installation_id)
+
+    def start_auto_refresh(self):
+        """Start the background thread that re-mints tokens before expiry"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._refresh_thread = Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
+
+    def stop_auto_refresh(self):
+        """Stop the background refresher"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+    def _refresh_loop(self):
+        """Sleep until the next token is due, then refresh it"""
+        while not self._stop_event.is_set():
+            delay = self.refresh_due()
+
+            self._wake_event.clear()
+            self._wake_event.wait(timeout=delay)
+            if self._stop_event.is_set():
+                break
+
+    def refresh_due(self) -> float:
+        """
+        Refresh every credential inside the refresh margin
+
+        Returns:
+            Seconds until the next credential enters the refresh margin
+        """
+        now = time.time()
+        with self._lock:
+            tokens = dict(self._tokens)
+            jwt = self._jwt
+
+        next_due = float(self.refresh_margin)
+
+        if jwt:
+            jwt_remaining = jwt[1] - now - JWT_LIFETIME / 2
+            if jwt_remaining <= 0:
+                with self._lock:
+                    self._jwt = self._sign_jwt(now)
+                jwt_remaining = JWT_LIFETIME / 2
+            next_due = min(next_due, jwt_remaining)
+
+        for installation_id, (_, expires_at) in tokens.items():
+            remaining = expires_at - now - self.refresh_margin
+            if remaining <= 0:
+                try:
+                    with self._mint_lock(installation_id):
+                        self._mint_token(installation_id)
+                except GitHubAppAuthError as e:
+                    print(f"Token refresh failed for installation {installation_id}: {e}")
+                    remaining = 30.0  # Retry shortly
+                else:
+                    continue
+            next_due = min(next_due, remaining)
+
+        return max(next_due, 1.0)
+
+    def token_provider(self, installation_id: int):
+        """
+        Build a callable returning the current token of one installation
+
+        Args:
+            installation_id: GitHub App installation ID
+
+        Returns:
+            Zero-argument callable for GitHubAuth.use_token_provider
+        """
+        return lambda: self.get_token(installation_id)
+
+
+def authenticate_from_environment(auth, repo: str = None) -> Optional[GitHubAppAuth]:
+    """
+    Switch a GitHubAuth to installation tokens when a GitHub App is configured
+
+    Reads GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH. The installation is
+    taken from GITHUB_APP_INSTALLATION_ID or looked up from ``repo``. The
+    first token is minted here and kept fresh by the background refresher.
+
+    Args:
+        auth: GitHubAuth whose API calls should use the app
+        repo: Repository as owner/name used to find the installation
+
+    Returns:
+        The running GitHubAppAuth, or None if no app is configured
+
+    Raises:
+        GitHubAppAuthError: If the app is configured but cannot authenticate
+    """
+    try:
+        app_auth = GitHubAppAuth.from_environment()
+    except (OSError, ValueError) as e:
+        raise GitHubAppAuthError(f"Cannot load GitHub App private key: {e}")
+    if app_auth is None:
+        return None
+
+    installation_id = os.environ.get('GITHUB_APP_INSTALLATION_ID')
+    if installation_id:
+        installation_id = int(installation_id)
+    elif repo and '/' in repo:
+        installation_id = app_auth.find_installation(*repo.split('/', 1))
+    if not installation_id:
+        raise GitHubAppAuthError(
+            "Set GITHUB_APP_INSTALLATION_ID or a repository the app is installed on"
+        )
+
+    app_auth.warm([installation_id])
+    app_auth.start_auto_refresh()
+    auth.use_token_provider(app_auth.token_provider(installation_id))
+    return app_auth
+
+
+# Demo usage
+if __name__ == '__main__':
+    # This is for testing purposes only
+    import sys
+    from github_auth import GitHubAuth
+
+    auth = GitHubAuth()
+    try:
+        app_auth = authenticate_from_environment(auth, sys.argv[1] if len(sys.argv) > 1 else None)
+    except GitHubAppAuthError as e:
+        print(e)
+        sys.exit(1)
+
+    if not app_auth:
+        print("Set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH to run this demo")
+    else:
+        print(f"Installation token: {auth.api_headers()['Authorization'][6:14]}...")
+        app_auth.stop_auto_refresh()
@@ -10,6 +10,7 @@ License: MIT
 """
 
 import json
+import os
 import requests
 import secrets
 import webbrowser
@@ -17,7 +18,33 @@ import urllib.parse
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from threading import Thread
 import time
-from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable
+
+
+# Workflow that provisions the Windows RDP runner
+WORKFLOW_FILE = 'tailscale-rdp.yml'
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a GitHub ISO 8601 timestamp into a Unix timestamp
+
+    Accepts fractional seconds and UTC offsets, e.g.
+    ``2020-01-20T09:42:40.000-08:00``. Values without an offset are taken
+    as UTC. Returns None for values that cannot be parsed.
+    """
+    if not value:
+        return None
+    if isinstance(value, str) and value.endswith('Z'):
+        value = value[:-1] + '+00:00'  # fromisoformat only accepts Z on 3.11+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 
 class GitHubOAuthHandler(BaseHTTPRequestHandler):
@@ -122,11 +149,43 @@ class GitHubAuth:
         self.redirect_uri = "http://localhost:8080/callback"
         self.scope = "repo,workflow"  # Required scopes for RDP management
         
+        # API configuration (overridable, e.g. to point at a replay server)
+        self.api_url = os.environ.get('GITHUB_API_URL', "https://api.github.com").rstrip('/')
+        self.server_url = os.environ.get('GITHUB_SERVER_URL', "https://github.com").rstrip('/')
+        
         # Runtime state
         self.access_token: Optional[str] = None
+        self.token_provider: Optional[Callable[[], str]] = None
         self.user_info: Optional[Dict[str, Any]] = None
         self.callback_server: Optional[HTTPServer] = None
     
+    def use_token_provider(self, token_provider: Callable[[], str]):
+        """
+        Authenticate API calls with tokens from a provider instead of OAuth
+        
+        Args:
+            token_provider: Callable returning a current access token, e.g.
+                GitHubAppAuth.token_provider(installation_id)
+        """
+        self.token_provider = token_provider
+    
+    def _current_token(self) -> Optional[str]:
+        """Return the token to send with API requests"""
+        if self.token_provider:
+            return self.token_provider()
+        return self.access_token
+    
+    def api_headers(self, accept: str = 'application/vnd.github.v3+json') -> Dict[str, str]:
+        """Build headers for an API request, authenticated when a token is available"""
+        headers = {
+            'Accept': accept,
+            'User-Agent': 'Windows-11-RDP-Manager/1.0'
+        }
+        token = self._current_token()
+        if token:
+            headers['Authorization'] = f'token {token}'
+        return headers
+    
     def start_oauth_flow(self) -> str:
         """
         Start the OAuth authorization flow
@@ -146,7 +205,7 @@ class GitHubAuth:
             'allow_signup': 'true'
         }
         
-        auth_url = "https://github.com/login/oauth/authorize?" + urllib.parse.urlencode(auth_params)
+        auth_url = f"{self.server_url}/login/oauth/authorize?" + urllib.parse.urlencode(auth_params)
         
         # Start local callback server
         self._start_callback_server()
@@ -173,19 +232,24 @@ class GitHubAuth:
         except Exception:
             pass  # Server was shutdown
     
-    def wait_for_callback(self, timeout: int = 300) -> Optional[str]:
+    def wait_for_callback(self, timeout: int = 300,
+                          should_stop: Callable[[], bool] = None) -> Optional[str]:
         """
         Wait for OAuth callback with authorization code
         
         Args:
             timeout: Maximum time to wait in seconds
+            should_stop: Optional callable; waiting is abandoned once it returns True
         
         Returns:
-            Authorization code if received, None if timeout
+            Authorization code if received, None if timeout or stopped
         """
         start_time = time.time()
         
         while time.time() - start_time < timeout:
+            if should_stop and should_stop():
+                break
+            
             if self.callback_server and hasattr(self.callback_server, 'auth_code'):
                 if self.callback_server.auth_code:
                     auth_code = self.callback_server.auth_code
@@ -227,7 +291,7 @@ class GitHubAuth:
         
         try:
             response = requests.post(
-                'https://github.com/login/oauth/access_token',
+                f'{self.server_url}/login/oauth/access_token',
                 data=token_data,
                 headers=headers,
                 timeout=30
@@ -257,18 +321,13 @@ class GitHubAuth:
         Returns:
             User info dictionary or None if failed
         """
-        if not self.access_token:
+        if not self.is_authenticated():
             return None
         
-        headers = {
-            'Authorization': f'token {self.access_token}',
-            'Accept': 'application/json',
-            'User-Agent': 'Windows-11-RDP-Manager/1.0'
-        }
-        
         try:
+            headers = self.api_headers('application/json')
             response = requests.get(
-                'https://api.github.com/user',
+                f'{self.api_url}/user',
                 headers=headers,
                 timeout=30
             )
@@ -296,24 +355,19 @@ class GitHubAuth:
         Returns:
             True if successful, False otherwise
         """
-        if not self.access_token:
+        if not self.is_authenticated():
             return False
         
-        headers = {
-            'Authorization': f'token {self.access_token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'Windows-11-RDP-Manager/1.0'
-        }
-        
         # Workflow dispatch payload
         payload = {
             'ref': 'main',
             'inputs': inputs or {}
         }
         
-        url = f'https://api.github.com/repos/{owner}/{repo}/actions/workflows/{workflow_file}/dispatches'
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/workflows/{workflow_file}/dispatches'
         
         try:
+            headers = self.api_headers()
             response = requests.post(
                 url,
                 json=payload,
@@ -338,18 +392,13 @@ class GitHubAuth:
         Returns:
             List of workflow runs or None if failed
         """
-        if not self.access_token:
+        if not self.is_authenticated():
             return None
         
-        headers = {
-            'Authorization': f'token {self.access_token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'Windows-11-RDP-Manager/1.0'
-        }
-        
-        url = f'https://api.github.com/repos/{owner}/{repo}/actions/runs'
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/runs'
         
         try:
+            headers = self.api_headers()
             response = requests.get(
                 url,
                 headers=headers,
@@ -365,13 +414,152 @@ class GitHubAuth:
         except Exception:
             return None
     
+    def list_workflow_runs(self, owner: str, repo: str, workflow_file: str,
+                           status: str = None, max_runs: int = 100) -> Optional[list]:
+        """
+        List runs of one workflow, following pagination
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            workflow_file: Workflow file name (e.g., 'tailscale-rdp.yml')
+            status: Optional status filter (e.g., 'completed', 'in_progress')
+            max_runs: Maximum number of runs to return
+        
+        Returns:
+            List of workflow runs (newest first) or None if failed
+        """
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/workflows/{workflow_file}/runs'
+        params = {'per_page': min(max_runs, 100), 'page': 1}
+        if status:
+            params['status'] = status
+        
+        runs = []
+        try:
+            while len(runs) < max_runs:
+                response = requests.get(
+                    url,
+                    headers=self.api_headers(),
+                    params=params,
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    return None
+                
+                page = response.json().get('workflow_runs', [])
+                runs.extend(page)
+                if len(page) < params['per_page']:
+                    break
+                params['page'] += 1
+                
+        except Exception:
+            return None
+        
+        return runs[:max_runs]
+    
+    def get_workflow_run_jobs(self, owner: str, repo: str, run_id: int) -> Optional[list]:
+        """
+        Get the jobs of a workflow run, including per-step timestamps
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            run_id: Workflow run ID
+        
+        Returns:
+            List of jobs or None if failed
+        """
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/runs/{run_id}/jobs'
+        
+        try:
+            response = requests.get(
+                url,
+                headers=self.api_headers(),
+                params={'per_page': 100},
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                return response.json().get('jobs', [])
+            else:
+                return None
+                
+        except Exception:
+            return None
+    
+    def cancel_workflow_run(self, owner: str, repo: str, run_id: int,
+                            force: bool = False) -> bool:
+        """
+        Request cancellation of a workflow run
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            run_id: Workflow run ID
+            force: Use force-cancel, which bypasses always() conditions
+        
+        Returns:
+            True if GitHub accepted the request, False otherwise
+        """
+        if not self.is_authenticated():
+            return False
+        
+        action = 'force-cancel' if force else 'cancel'
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/runs/{run_id}/{action}'
+        
+        try:
+            response = requests.post(
+                url,
+                headers=self.api_headers(),
+                timeout=30
+            )
+            
+            return response.status_code == 202  # GitHub returns 202 when cancellation is queued
+            
+        except Exception as e:
+            print(f"Error cancelling workflow run: {e}")
+            return False
+    
+    def get_workflow_run(self, owner: str, repo: str, run_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a single workflow run
+        
+        Works without authentication for public repositories.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            run_id: Workflow run ID
+        
+        Returns:
+            Workflow run dictionary or None if failed
+        """
+        url = f'{self.api_url}/repos/{owner}/{repo}/actions/runs/{run_id}'
+        
+        try:
+            response = requests.get(
+                url,
+                headers=self.api_headers(),
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                return None
+                
+        except Exception:
+            return None
+    
     def is_authenticated(self) -> bool:
         """Check if user is authenticated"""
-        return self.access_token is not None
+        return self.access_token is not None or self.token_provider is not None
     
     def logout(self):
         """Clear authentication state"""
         self.access_token = None
+        self.token_provider = None
         self.user_info = None
         self._stop_callback_server()
 
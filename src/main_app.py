@@ -16,66 +16,142 @@ Author: Windows 11 RDP Project
 License: MIT
 """
 
+import itertools
+import os
+import re
 import sys
-import json
-import requests
+import time
 import webbrowser
 from PyQt5 import QtWidgets, QtCore, QtGui
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit, QGroupBox,
     QProgressBar, QTabWidget, QMessageBox, QSystemTrayIcon,
-    QMenu, QAction, QStatusBar
+    QMenu, QAction, QStatusBar, QCheckBox
 )
-from PyQt5.QtGui import QIcon, QPixmap, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon, QPixmap, QFont, QDesktopServices
+from PyQt5.QtCore import Qt, QUrl
 
-
-class GitHubAuthWorker(QThread):
-    """Background worker for GitHub OAuth authentication"""
-    auth_completed = pyqtSignal(str)  # Emits access token
-    auth_failed = pyqtSignal(str)     # Emits error message
-    
-    def __init__(self, auth_code):
-        super().__init__()
-        self.auth_code = auth_code
-    
-    def run(self):
-        try:
-            # TODO: Implement GitHub OAuth token exchange
-            # This is a placeholder for the actual OAuth implementation
-            self.auth_completed.emit("mock_token_123")
-        except Exception as e:
-            self.auth_failed.emit(str(e))
+from artifact_cache import ArtifactCache
+from github_app_auth import authenticate_from_environment
+from github_auth import GitHubAuth, WORKFLOW_FILE
+from provisioning_analytics import analyze, collect_timings, format_report
+from profiling import ProfilingSession, profile_output_dir, profiling_requested
+from secret_sync import SecretSync, summarize
+from session_scheduler import SessionScheduler, find_busy_repos
+from session_teardown import (
+    MAX_SESSION_AGE, STOPPED_OUTCOMES, find_reapable_runs, summarize as summarize_teardown,
+    teardown_runs
+)
+from state_store import StateStore, diff_sessions
+from task_runner import shared_runner
 
 
-class WorkflowMonitor(QThread):
+class WorkflowMonitor(QObject):
     """Monitor GitHub Actions workflow status"""
     status_update = pyqtSignal(str)
+    run_update = pyqtSignal(dict)  # Emits the tracked workflow run
     rdp_ready = pyqtSignal(dict)  # Emits connection info
     
-    def __init__(self, github_token, repo_owner, repo_name):
-        super().__init__()
-        self.github_token = github_token
+    def __init__(self, github_auth, task_runner, repo_owner, repo_name,
+                 dispatched_at=0.0, known_run_ids=(), parent=None):
+        super().__init__(parent)
+        self.github_auth = github_auth
+        self.task_runner = task_runner
         self.repo_owner = repo_owner
         self.repo_name = repo_name
+        self.dispatched_at = dispatched_at
+        # Runs that existed before the dispatch can never be this session's
+        self.known_run_ids = set(known_run_ids)
+        self.run_id = None
+        self.last_status = None
         self.running = False
+        self._poll_task = None
+        
+        self.timer = QTimer(self)
+        self.timer.setInterval(5000)  # Check every 5 seconds
+        self.timer.timeout.connect(self.poll)
     
-    def run(self):
+    def start(self):
         self.running = True
-        while self.running:
-            try:
-                # TODO: Poll GitHub Actions API for workflow status
-                # This is a placeholder implementation
-                self.status_update.emit("Monitoring workflow...")
-                self.msleep(5000)  # Check every 5 seconds
-            except Exception as e:
-                self.status_update.emit(f"Error: {str(e)}")
-                break
+        self.status_update.emit("Monitoring workflow...")
+        self.poll()
+        self.timer.start()
+    
+    def poll(self):
+        """Fetch workflow runs in the background unless a poll is in flight"""
+        if not self.running or self._poll_task is not None:
+            return
+        
+        self._poll_task = self.task_runner.submit(
+            self._fetch_run,
+            name="Workflow status",
+            on_result=self._on_run,
+            on_error=lambda error: self.status_update.emit(f"Error: {error}"),
+            on_finished=self._on_poll_finished
+        )
+    
+    def _fetch_run(self, ctx):
+        """Find the dispatched run (runs on a pool thread)"""
+        runs = self.github_auth.get_workflow_runs(self.repo_owner, self.repo_name)
+        if runs is None:
+            raise RuntimeError("Failed to fetch workflow runs")
+        
+        for run in runs:
+            if self.run_id is not None:
+                if run.get('id') == self.run_id:
+                    return run
+                continue
+            
+            if not run.get('path', '').endswith(WORKFLOW_FILE):
+                continue
+            if run.get('id') in self.known_run_ids:
+                continue
+            created = QtCore.QDateTime.fromString(run.get('created_at', ''), Qt.ISODate)
+            # Allow for clock skew between this machine and GitHub
+            if created.toSecsSinceEpoch() >= self.dispatched_at - 60:
+                return run
+        return None
+    
+    def _on_run(self, run):
+        """Handle a poll result on the GUI thread"""
+        if not self.running:
+            return
+        
+        if run is None:
+            self.status_update.emit("Waiting for workflow run to appear...")
+            return
+        
+        self.run_id = run['id']
+        status = run.get('status')
+        if status == self.last_status:
+            return
+        self.last_status = status
+        self.run_update.emit(run)
+        
+        if status == 'completed':
+            self.status_update.emit(f"Workflow run finished: {run.get('conclusion')}")
+            self.stop()
+        else:
+            self.status_update.emit(f"Workflow run {self.run_id}: {status}")
+        
+        if status == 'in_progress':
+            self.rdp_ready.emit({
+                'repo': f"{self.repo_owner}/{self.repo_name}",
+                'run_id': self.run_id,
+                'html_url': run.get('html_url', ''),
+                'username': 'runneradmin'
+            })
+    
+    def _on_poll_finished(self):
+        self._poll_task = None
     
     def stop(self):
         self.running = False
+        self.timer.stop()
+        if self._poll_task is not None:
+            self._poll_task.cancel()
 
 
 class TailscaleRDPApp(QMainWindow):
@@ -85,10 +161,56 @@ class TailscaleRDPApp(QMainWindow):
         super().__init__()
         self.github_token = None
         self.tailscale_key = None
-        self.workflow_monitor = None
+        # Active workflow monitors keyed by repository (owner/name)
+        self.workflow_monitors = {}
+        self.oauth_task = None
+        self.app_auth = None
+        self.tray_icon = None
+        
+        self.github_auth = GitHubAuth(
+            os.environ.get('GITHUB_CLIENT_ID'),
+            os.environ.get('GITHUB_CLIENT_SECRET')
+        )
+        self.task_runner = shared_runner()
+        self.scheduler = SessionScheduler()
+        self.secret_sync = SecretSync(self.github_auth)
+        self.artifact_cache = ArtifactCache(self.github_auth)
+        
+        # Retry fetching connection info artifacts until each session has one
+        self.info_fetches = set()
+        self.info_received = set()
+        self.info_timer = QTimer(self)
+        self.info_timer.setInterval(15000)
+        self.info_timer.timeout.connect(self.fetch_pending_connection_info)
+        
+        # Start requests waiting for the availability check, and dispatch
+        # requests in flight (repo -> request); Stop cancels both
+        self.start_ids = itertools.count(1)
+        self.pending_starts = set()
+        self.dispatching = {}
+        self.cancelled_requests = set()
+        
+        # Re-check repository availability while requests are queued
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(30000)
+        self.queue_timer.timeout.connect(self.resync_repositories)
+        
+        # Tracked sessions keyed by run ID (as a string, matching the state file)
+        self.sessions = {}
+        self.connection_text = ""
+        self.connection_stale = False
+        # Set when cached sessions could not be refreshed (e.g. before sign-in)
+        self.revalidation_failed = False
+        self.state_store = StateStore()
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(500)
+        self.save_timer.timeout.connect(self.save_state)
         
         self.init_ui()
         self.setup_system_tray()
+        self.restore_state()
+        self.start_app_auth()
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -108,6 +230,7 @@ class TailscaleRDPApp(QMainWindow):
         # Setup tabs
         self.setup_auth_tab()
         self.setup_rdp_tab()
+        self.setup_analytics_tab()
         self.setup_settings_tab()
         
         # Main layout
@@ -172,6 +295,17 @@ class TailscaleRDPApp(QMainWindow):
         save_key_btn.clicked.connect(self.save_tailscale_key)
         tailscale_layout.addWidget(save_key_btn)
         
+        self.sync_key_btn = QPushButton("Sync Key to Repository Secrets")
+        self.sync_key_btn.clicked.connect(self.sync_tailscale_key)
+        self.sync_key_btn.setEnabled(False)
+        tailscale_layout.addWidget(self.sync_key_btn)
+        
+        self.force_sync_check = QCheckBox("Push even to repositories that already have this key")
+        self.force_sync_check.setToolTip(
+            "Use this if a secret was changed or deleted outside this app"
+        )
+        tailscale_layout.addWidget(self.force_sync_check)
+        
         self.tailscale_status = QLabel("Key not configured")
         self.tailscale_status.setStyleSheet("color: red;")
         tailscale_layout.addWidget(self.tailscale_status)
@@ -206,6 +340,15 @@ class TailscaleRDPApp(QMainWindow):
         self.stop_rdp_btn.setEnabled(False)
         button_layout.addWidget(self.stop_rdp_btn)
         
+        self.reap_btn = QPushButton("Clean Up Stale Runs")
+        self.reap_btn.clicked.connect(self.reap_stale_runs)
+        self.reap_btn.setEnabled(False)
+        button_layout.addWidget(self.reap_btn)
+        
+        self.logs_btn = QPushButton("Open Session Logs")
+        self.logs_btn.clicked.connect(self.open_session_logs)
+        button_layout.addWidget(self.logs_btn)
+        
         layout.addLayout(button_layout)
         
         # Progress bar
@@ -239,6 +382,36 @@ class TailscaleRDPApp(QMainWindow):
         rdp_tab.setLayout(layout)
         self.tabs.addTab(rdp_tab, "RDP Session")
     
+    def setup_analytics_tab(self):
+        """Setup provisioning analytics tab"""
+        analytics_tab = QWidget()
+        layout = QVBoxLayout()
+        
+        # Title
+        title = QLabel("Provisioning Analytics")
+        title.setFont(QFont("Arial", 14, QFont.Bold))
+        layout.addWidget(title)
+        
+        info = QLabel(
+            "Analyze recent workflow runs to see which steps make you wait "
+            "for a session."
+        )
+        info.setWordWrap(True)
+        layout.addWidget(info)
+        
+        self.analytics_btn = QPushButton("Analyze Provisioning Time")
+        self.analytics_btn.clicked.connect(self.run_provisioning_analytics)
+        layout.addWidget(self.analytics_btn)
+        
+        self.analytics_text = QTextEdit()
+        self.analytics_text.setReadOnly(True)
+        self.analytics_text.setFont(QFont("Courier New", 9))
+        self.analytics_text.setPlaceholderText("The report will appear here...")
+        layout.addWidget(self.analytics_text)
+        
+        analytics_tab.setLayout(layout)
+        self.tabs.addTab(analytics_tab, "Analytics")
+    
     def setup_settings_tab(self):
         """Setup settings tab"""
         settings_tab = QWidget()
@@ -256,8 +429,15 @@ class TailscaleRDPApp(QMainWindow):
         repo_layout.addWidget(QLabel("GitHub Repository (owner/name):"))
         self.repo_input = QLineEdit()
         self.repo_input.setPlaceholderText("e.g., username/windows-11-rdp")
+        self.repo_input.editingFinished.connect(self.schedule_save)
         repo_layout.addWidget(self.repo_input)
         
+        repo_layout.addWidget(QLabel("Additional repositories/forks for concurrent sessions:"))
+        self.pool_repos_input = QLineEdit()
+        self.pool_repos_input.setPlaceholderText("e.g., username/rdp-fork-1, username/rdp-fork-2")
+        self.pool_repos_input.editingFinished.connect(self.schedule_save)
+        repo_layout.addWidget(self.pool_repos_input)
+        
         repo_group.setLayout(repo_layout)
         layout.addWidget(repo_group)
         
@@ -326,31 +506,110 @@ class TailscaleRDPApp(QMainWindow):
     
     def github_oauth(self):
         """Handle GitHub OAuth authentication"""
-        # TODO: Implement proper GitHub OAuth flow
-        # For now, this is a placeholder
-        
-        oauth_url = (
-            "https://github.com/login/oauth/authorize?"
-            "client_id=YOUR_CLIENT_ID&"
-            "scope=repo,workflow&"
-            "redirect_uri=http://localhost:8080/callback"
-        )
+        if self.oauth_task is not None:
+            return
         
         reply = QMessageBox.information(
             self,
             "GitHub Authentication",
-            "This will open GitHub in your browser for authentication.\n\n"
-            "Note: Full OAuth implementation coming soon!",
+            "This will open GitHub in your browser for authentication.",
             QMessageBox.Ok | QMessageBox.Cancel
         )
         
-        if reply == QMessageBox.Ok:
-            webbrowser.open(oauth_url)
-            # Simulate successful auth for demo
-            self.github_token = "demo_token"
-            self.github_status.setText("✓ Authenticated")
-            self.github_status.setStyleSheet("color: green;")
-            self.update_ui_state()
+        if reply != QMessageBox.Ok:
+            return
+        
+        try:
+            oauth_url = self.github_auth.start_oauth_flow()
+        except Exception as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return
+        
+        webbrowser.open(oauth_url)
+        self.github_auth_btn.setEnabled(False)
+        self.github_status.setText("Waiting for browser authorization...")
+        self.github_status.setStyleSheet("color: orange;")
+        
+        self.oauth_task = self.task_runner.submit(
+            self._complete_oauth,
+            name="GitHub authentication",
+            on_result=self.on_oauth_completed,
+            on_error=self.on_oauth_failed,
+            on_progress=lambda _, message: self.github_status.setText(message),
+            on_finished=self._on_oauth_finished
+        )
+    
+    def _complete_oauth(self, ctx):
+        """Wait for the callback and exchange the code (runs on a pool thread)"""
+        auth_code = self.github_auth.wait_for_callback(should_stop=ctx.is_cancelled)
+        ctx.check_cancelled()
+        if not auth_code:
+            raise RuntimeError("No authorization code received")
+        
+        ctx.report_progress(50, "Exchanging authorization code...")
+        if not self.github_auth.exchange_code_for_token(auth_code):
+            raise RuntimeError("Failed to exchange code for token")
+        
+        ctx.report_progress(75, "Fetching user information...")
+        return self.github_auth.get_user_info() or {}
+    
+    def start_app_auth(self):
+        """Authenticate as a GitHub App when one is configured (unattended use)"""
+        if not os.environ.get('GITHUB_APP_ID'):
+            return
+        
+        repos = self.configured_repos()
+        self.github_auth_btn.setEnabled(False)
+        self.github_status.setText("Authenticating as GitHub App...")
+        self.github_status.setStyleSheet("color: orange;")
+        
+        self.task_runner.submit(
+            lambda ctx: authenticate_from_environment(
+                self.github_auth, repos[0] if repos else None
+            ),
+            name="GitHub App authentication",
+            on_result=self.on_app_auth_completed,
+            on_error=self.on_oauth_failed,
+            on_finished=lambda: self.github_auth_btn.setEnabled(True)
+        )
+    
+    def on_app_auth_completed(self, app_auth):
+        """Apply a successful GitHub App authentication"""
+        if app_auth is None:
+            self.github_status.setText("Not authenticated")
+            self.github_status.setStyleSheet("color: red;")
+            return
+        
+        self.app_auth = app_auth
+        self.github_status.setText(f"✓ Authenticated as GitHub App {app_auth.app_id}")
+        self.github_status.setStyleSheet("color: green;")
+        self.log_message("Using GitHub App installation tokens.")
+        self.update_ui_state()
+        self.revalidate_after_sign_in()
+    
+    def on_oauth_completed(self, user_info):
+        """Apply a successful OAuth result"""
+        if self.app_auth:
+            # An explicit sign-in replaces the GitHub App
+            self.app_auth.stop_auto_refresh()
+            self.app_auth = None
+            self.github_auth.use_token_provider(None)
+        self.github_token = self.github_auth.access_token
+        login = user_info.get('login')
+        self.github_status.setText(f"✓ Authenticated as {login}" if login else "✓ Authenticated")
+        self.github_status.setStyleSheet("color: green;")
+        self.update_ui_state()
+        self.revalidate_after_sign_in()
+    
+    def on_oauth_failed(self, error):
+        """Report a failed OAuth attempt"""
+        self.github_status.setText("Not authenticated")
+        self.github_status.setStyleSheet("color: red;")
+        self.log_message(f"GitHub authentication failed: {error}")
+    
+    def _on_oauth_finished(self):
+        self.oauth_task = None
+        self.github_auth_btn.setEnabled(True)
     
     def save_tailscale_key(self):
         """Save Tailscale authentication key"""
@@ -373,77 +632,612 @@ class TailscaleRDPApp(QMainWindow):
         
         # TODO: Securely store the key
         self.log_message("Tailscale auth key configured successfully.")
+        if self.github_auth.is_authenticated():
+            self.log_message("Use 'Sync Key to Repository Secrets' to update your repositories.")
+    
+    def sync_tailscale_key(self):
+        """Push the Tailscale key to TAILSCALE_AUTH_TOKEN in every repository"""
+        repos = self.configured_repos()
+        if not repos:
+            QMessageBox.warning(
+                self, "Warning", 
+                "Please enter a valid repository name (owner/repo)."
+            )
+            return
+        
+        key = self.tailscale_key
+        force = self.force_sync_check.isChecked()
+        self.sync_key_btn.setEnabled(False)
+        self.log_message(f"Syncing Tailscale key to {len(repos)} repositories...")
+        
+        def sync(ctx):
+            started = time.perf_counter()
+            results = self.secret_sync.sync(
+                repos, key, force=force,
+                progress=lambda done, total: ctx.report_progress(
+                    done * 100 // total, f"{done}/{total} repositories"
+                )
+            )
+            return results, time.perf_counter() - started
+        
+        self.task_runner.submit(
+            sync,
+            name="Secret sync",
+            on_result=self.on_secret_sync_done,
+            on_error=self.log_message,
+            on_progress=lambda _, message: self.tailscale_status.setText(f"Syncing {message}"),
+            on_finished=lambda: self.sync_key_btn.setEnabled(self.github_auth.is_authenticated())
+        )
+    
+    def on_secret_sync_done(self, outcome):
+        """Report the result of a secret sync"""
+        results, elapsed = outcome
+        for repo, result in sorted(results.items()):
+            if result.startswith('failed'):
+                self.log_message(f"{repo}: {result}")
+        self.log_message(summarize(results, elapsed))
+        self.tailscale_status.setText("✓ Key configured and synced")
+        self.tailscale_status.setStyleSheet("color: green;")
     
     def start_rdp_session(self):
         """Start a new RDP session"""
-        if not self.github_token or not self.tailscale_key:
+        if not self.github_auth.is_authenticated() or not self.tailscale_key:
             QMessageBox.warning(
                 self, "Warning", 
                 "Please complete GitHub and Tailscale authentication first."
             )
             return
         
-        repo = self.repo_input.text().strip()
-        if not repo or '/' not in repo:
+        repos = self.configured_repos()
+        if not repos:
             QMessageBox.warning(
                 self, "Warning", 
                 "Please enter a valid repository name (owner/repo)."
             )
             return
         
-        self.start_rdp_btn.setEnabled(False)
         self.stop_rdp_btn.setEnabled(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate progress
         
         self.log_message("Starting RDP session...")
-        self.log_message("Repository: " + repo)
+        self.log_message(f"Checking {len(repos)} repositories for a free slot...")
+        
+        inputs = {}
+        password = self.rdp_password_input.text()
+        if password:
+            inputs['rdp_password'] = password
+        
+        self.dispatch_placements(self.scheduler.set_repos(repos))
+        start_id = next(self.start_ids)
+        self.pending_starts.add(start_id)
+        self.task_runner.submit(
+            lambda ctx: find_busy_repos(self.github_auth, repos),
+            name="Repository availability",
+            on_result=lambda busy: self.place_session(busy, inputs, start_id),
+            on_error=lambda error: self.place_session({}, inputs, start_id)
+        )
+    
+    def configured_repos(self):
+        """Primary repository followed by the additional pool repositories"""
+        candidates = [self.repo_input.text()] + self.pool_repos_input.text().split(',')
+        repos = []
+        for repo in (candidate.strip() for candidate in candidates):
+            if repo and '/' in repo and repo not in repos:
+                repos.append(repo)
+        return repos
+    
+    def place_session(self, busy, inputs, start_id=None):
+        """Place a new session request on a free repository or queue it"""
+        self.dispatch_placements(self.scheduler.sync_busy(busy))
+        
+        if start_id is not None:
+            if start_id not in self.pending_starts:
+                return  # Stopped before the availability check finished
+            self.pending_starts.discard(start_id)
+        
+        request, repo = self.scheduler.request(inputs)
+        if repo:
+            self.dispatch_session(repo, request)
+        else:
+            self.log_message(
+                f"All repositories are busy; request queued "
+                f"(position {self.scheduler.queue_length()})."
+            )
+            self.queue_timer.start()
+    
+    def dispatch_placements(self, placements):
+        """Dispatch sessions for queued requests that got a repository"""
+        for request, repo in placements:
+            self.log_message(f"Queued request {request['id']} placed on {repo}.")
+            self.dispatch_session(repo, request)
+        if not self.scheduler.queue_length():
+            self.queue_timer.stop()
+    
+    def resync_repositories(self):
+        """Refresh which repositories are busy and place queued requests"""
+        repos = self.configured_repos()
+        self.dispatch_placements(self.scheduler.set_repos(repos))
+        self.task_runner.submit(
+            lambda ctx: find_busy_repos(self.github_auth, repos),
+            name="Repository availability",
+            on_result=lambda busy: self.dispatch_placements(self.scheduler.sync_busy(busy))
+        )
+    
+    def dispatch_session(self, repo, request):
+        """Trigger the workflow on the repository chosen for a request"""
+        self.log_message(f"Repository: {repo}")
         self.log_message("Triggering GitHub Actions workflow...")
         
-        # TODO: Implement actual workflow trigger
-        # For now, simulate the process
-        QTimer.singleShot(3000, self.simulate_rdp_ready)
+        owner, name = repo.split('/', 1)
+        inputs = request['payload']
+        dispatched_at = time.time()
+        self.dispatching[repo] = request
+        
+        def dispatch(ctx):
+            # Remember existing runs so a just-cancelled run of an earlier
+            # session is not mistaken for the new one
+            existing = self.github_auth.list_workflow_runs(owner, name, WORKFLOW_FILE, max_runs=10)
+            known_run_ids = {run.get('id') for run in existing or []}
+            ok = self.github_auth.trigger_workflow(owner, name, WORKFLOW_FILE, inputs)
+            return ok, known_run_ids
+        
+        self.task_runner.submit(
+            dispatch,
+            name="Workflow dispatch",
+            on_result=lambda outcome: self.on_workflow_dispatched(
+                outcome[0], repo, request, dispatched_at, outcome[1]
+            ),
+            on_error=lambda error: self.on_workflow_dispatched(
+                False, repo, request, dispatched_at
+            )
+        )
+    
+    def on_workflow_dispatched(self, ok, repo, request, dispatched_at, known_run_ids=()):
+        """Start monitoring once the dispatch request returns"""
+        if self.dispatching.get(repo) is request:
+            del self.dispatching[repo]
+        
+        if request['id'] in self.cancelled_requests:
+            # Stop was pressed while the dispatch was in flight
+            self.cancelled_requests.discard(request['id'])
+            if ok:
+                self.stop_late_dispatch(repo, known_run_ids)
+            else:
+                self.on_session_ended(repo)
+            return
+        
+        if not ok:
+            self.log_message(f"Failed to trigger workflow on {repo}.")
+            self.on_session_ended(repo)
+            return
+        
+        self.log_message("Workflow triggered, waiting for runner...")
+        owner, name = repo.split('/', 1)
+        monitor = WorkflowMonitor(
+            self.github_auth, self.task_runner, owner, name, dispatched_at,
+            known_run_ids, self
+        )
+        monitor.status_update.connect(lambda message: self.log_message(f"{repo}: {message}"))
+        monitor.run_update.connect(lambda run: self.on_run_update(repo, run))
+        monitor.rdp_ready.connect(self.on_rdp_ready)
+        self.workflow_monitors[repo] = monitor
+        monitor.start()
+    
+    def on_run_update(self, repo, run):
+        """Track a run and free its repository when it completes"""
+        self.record_session(repo, run)
+        if run.get('status') == 'completed':
+            self.on_session_ended(repo)
+    
+    def on_session_ended(self, repo):
+        """Free a repository and hand it to the next queued request"""
+        monitor = self.workflow_monitors.pop(repo, None)
+        if monitor:
+            monitor.stop()
+        
+        self.dispatch_placements(self.scheduler.release(repo))
+        self.update_session_controls()
+    
+    def update_session_controls(self):
+        """Reflect whether any session is running or waiting"""
+        active = bool(self.scheduler.busy_repos() - self.external_repos())
+        waiting = self.scheduler.queue_length() > 0 or bool(self.pending_starts)
+        self.stop_rdp_btn.setEnabled(active or waiting)
+        if not active and not waiting:
+            self.progress_bar.setVisible(False)
+    
+    def external_repos(self):
+        """Repositories busy with runs this app did not start"""
+        return {
+            repo for repo, assignment in self.scheduler.assignments.items()
+            if assignment.get('external')
+        }
     
     def stop_rdp_session(self):
-        """Stop the current RDP session"""
-        if self.workflow_monitor:
-            self.workflow_monitor.stop()
-            self.workflow_monitor = None
+        """Stop all RDP sessions started from this app and cancel their runs"""
+        for request in list(self.scheduler.queue):
+            self.scheduler.cancel_request(request['id'])
+        self.queue_timer.stop()
+        self.pending_starts.clear()
+        
+        # Dispatches in flight are stopped once their request returns
+        for repo, request in self.dispatching.items():
+            self.cancelled_requests.add(request['id'])
+            self.log_message(f"{repo}: stopping once the workflow dispatch returns...")
+        
+        targets = {repo: monitor.run_id for repo, monitor in self.workflow_monitors.items()}
+        for monitor in self.workflow_monitors.values():
+            monitor.stop()
         
-        self.start_rdp_btn.setEnabled(True)
         self.stop_rdp_btn.setEnabled(False)
-        self.progress_bar.setVisible(False)
+        self.log_message(f"Stopping {len(targets)} session(s)...")
+        
+        def teardown(ctx):
+            runs = [(repo, run_id) for repo, run_id in targets.items() if run_id]
+            # Runs dispatched but not yet seen by the monitor are found by listing
+            unknown = [repo for repo, run_id in targets.items() if not run_id]
+            if unknown:
+                runs += find_reapable_runs(self.github_auth, unknown)
+            return teardown_runs(self.github_auth, runs, should_stop=ctx.is_cancelled)
+        
+        self.task_runner.submit(
+            teardown,
+            name="Session teardown",
+            on_result=lambda results: self.on_teardown_done(list(targets), results),
+            on_error=lambda error: self.on_teardown_done(list(targets), [], error)
+        )
+    
+    def stop_late_dispatch(self, repo, known_run_ids):
+        """Cancel the run of a session that was stopped while being dispatched"""
+        owner, name = repo.split('/', 1)
+        
+        def teardown(ctx):
+            # The new run takes a moment to be listed after the dispatch
+            deadline = time.time() + 30
+            while time.time() < deadline:
+                runs = self.github_auth.list_workflow_runs(owner, name, WORKFLOW_FILE, max_runs=10)
+                new_runs = [
+                    (repo, run['id']) for run in runs or []
+                    if run.get('id') not in known_run_ids and run.get('status') != 'completed'
+                ]
+                if new_runs:
+                    return teardown_runs(self.github_auth, new_runs, should_stop=ctx.is_cancelled)
+                if ctx.wait(2):
+                    break
+            return []
+        
+        self.task_runner.submit(
+            teardown,
+            name="Session teardown",
+            on_result=lambda results: self.on_teardown_done([repo], results),
+            on_error=lambda error: self.on_teardown_done([repo], [], error)
+        )
+    
+    def reap_stale_runs(self):
+        """Cancel active runs that no session owns or that outlived the session limit"""
+        keep = {monitor.run_id for monitor in self.workflow_monitors.values() if monitor.run_id}
+        # A session dispatched moments ago has no known run yet; its run
+        # would look orphaned, so leave those repositories alone
+        pending = {
+            repo for repo, assignment in self.scheduler.assignments.items()
+            if not assignment.get('external') and (
+                repo not in self.workflow_monitors or self.workflow_monitors[repo].run_id is None
+            )
+        }
+        repos = [repo for repo in self.configured_repos() if repo not in pending]
+        self.reap_btn.setEnabled(False)
+        self.log_message(f"Looking for orphaned runs in {len(repos)} repositories...")
         
-        self.log_message("RDP session stopped.")
-        self.conn_info.setText("No active session")
+        def reap(ctx):
+            runs = find_reapable_runs(
+                self.github_auth, repos, keep_run_ids=keep, max_age=MAX_SESSION_AGE
+            )
+            ctx.check_cancelled()
+            return teardown_runs(self.github_auth, runs, should_stop=ctx.is_cancelled)
+        
+        self.task_runner.submit(
+            reap,
+            name="Run cleanup",
+            on_result=lambda results: self.on_teardown_done([], results),
+            on_error=lambda error: self.on_teardown_done([], [], error),
+            on_finished=lambda: self.reap_btn.setEnabled(self.github_auth.is_authenticated())
+        )
     
-    def simulate_rdp_ready(self):
-        """Simulate RDP session being ready (for demo purposes)"""
+    def on_teardown_done(self, repos, results, error=None):
+        """Report teardown latency and free repositories whose runs ended"""
+        if error:
+            self.log_message(f"Teardown error: {error}")
+        unconfirmed = {}
+        for result in results:
+            self.log_message(
+                f"{result['repo']} run {result['run_id']}: "
+                f"{result['outcome']} in {result['latency']:.1f} s"
+            )
+            if result['outcome'] in STOPPED_OUTCOMES:
+                self.dispatch_placements(self.scheduler.release_run(result['run_id']))
+            else:
+                unconfirmed[result['repo']] = result['run_id']
+        self.log_message(summarize_teardown(results))
+        
+        for repo in repos:
+            if repo in unconfirmed or error:
+                # The run may still hold the concurrency slot; let sync_busy
+                # free the repository once GitHub no longer reports it
+                self.log_message(f"{repo}: stop not confirmed, keeping the repository reserved.")
+                monitor = self.workflow_monitors.pop(repo, None)
+                if monitor:
+                    monitor.stop()
+                self.scheduler.mark_external(repo, unconfirmed.get(repo))
+            else:
+                self.on_session_ended(repo)
+        self.update_session_controls()
+        
+        if repos:
+            self.log_message("RDP session stopped.")
+            self.show_connection_info("No active session")
+    
+    def on_rdp_ready(self, conn_details):
+        """Show connection details once the runner is up"""
         self.progress_bar.setVisible(False)
-        self.log_message("✓ RDP session is ready!")
-        
-        # Simulate connection info
-        conn_details = {
-            'ip': '100.64.0.123',
-            'username': 'runneradmin',
-            'password': 'P@ssw0rd123!'
-        }
+        self.log_message("✓ RDP runner is up!")
         
         conn_text = (
-            f"🎉 RDP Connection Ready!\n\n"
-            f"Tailscale IP: {conn_details['ip']}\n"
+            f"🎉 RDP Runner Started!\n\n"
+            f"Repository: {conn_details['repo']}\n"
             f"Username: {conn_details['username']}\n"
-            f"Password: {conn_details['password']}\n\n"
-            f"Connect using any RDP client."
+            f"Password: your configured RDP password\n\n"
+            f"The Tailscale IP appears in the workflow log:\n"
+            f"{conn_details['html_url']}"
         )
         
-        self.conn_info.setText(conn_text)
+        self.show_connection_info(conn_text)
         self.log_message("Connection details updated.")
+        
+        self.fetch_pending_connection_info()
+        self.info_timer.start()
+    
+    def fetch_pending_connection_info(self):
+        """Download the connection info artifact of running sessions that lack it"""
+        pending = [
+            (repo, monitor.run_id) for repo, monitor in self.workflow_monitors.items()
+            if monitor.last_status == 'in_progress'
+            and monitor.run_id not in self.info_fetches | self.info_received
+        ]
+        if not pending:
+            if not self.workflow_monitors:
+                self.info_timer.stop()
+            return
+        
+        for repo, run_id in pending:
+            self.info_fetches.add(run_id)
+            self.task_runner.submit(
+                lambda ctx, repo=repo, run_id=run_id: self.artifact_cache.connection_info(repo, run_id),
+                name="Connection info",
+                on_result=lambda text, repo=repo, run_id=run_id: self.on_connection_info(repo, run_id, text),
+                on_finished=lambda run_id=run_id: self.info_fetches.discard(run_id)
+            )
+    
+    def on_connection_info(self, repo, run_id, text):
+        """Show the connection info written by the workflow"""
+        if not text:
+            return  # Not uploaded yet; retried by info_timer
+        
+        self.info_received.add(run_id)
+        self.show_connection_info(f"Repository: {repo}\n{text}")
+        self.log_message(f"{repo}: connection info received.")
+    
+    def open_session_logs(self):
+        """Download (or reuse cached) logs of the latest session and open them"""
+        if not self.sessions:
+            QMessageBox.information(self, "Session Logs", "No sessions have been tracked yet.")
+            return
+        
+        session = max(self.sessions.values(), key=lambda s: s.get('updated_at', 0))
+        repo, run_id = session['repo'], session['run_id']
+        completed = session.get('status') == 'completed'
+        self.logs_btn.setEnabled(False)
+        self.log_message(f"Opening logs of {repo} run {run_id}...")
+        
+        def fetch(ctx):
+            archive_path = self.artifact_cache.fetch_logs(repo, run_id, completed)
+            if archive_path is None:
+                raise RuntimeError("Logs are not available")
+            return self.artifact_cache.extract(archive_path)
+        
+        self.task_runner.submit(
+            fetch,
+            name="Session logs",
+            on_result=lambda folder: folder and QDesktopServices.openUrl(QUrl.fromLocalFile(folder)),
+            on_error=self.log_message,
+            on_finished=lambda: self.logs_btn.setEnabled(True)
+        )
+    
+    def show_connection_info(self, text, stale=False):
+        """Display connection info, marking cached values as stale"""
+        if stale:
+            self.conn_info.setText(f"{text}\n\n(cached - refreshing...)")
+            self.conn_info.setStyleSheet(
+                "padding: 10px; border: 1px dashed gray; background-color: #f0f0f0; color: gray;"
+            )
+        else:
+            self.conn_info.setText(text)
+            self.conn_info.setStyleSheet(
+                "padding: 10px; border: 1px solid gray; background-color: #f0f0f0;"
+            )
+        # The state file must not contain the RDP password
+        self.connection_text = re.sub(r'(?m)^(\s*Password:).*$', r'\1 ********', text)
+        self.connection_stale = stale
+        self.schedule_save()
+    
+    @staticmethod
+    def session_from_run(repo, run):
+        """Extract the fields of a workflow run that the dashboard tracks"""
+        return {
+            'repo': repo,
+            'run_id': run.get('id'),
+            'status': run.get('status'),
+            'conclusion': run.get('conclusion'),
+            'html_url': run.get('html_url', ''),
+            'updated_at': time.time()
+        }
+    
+    def record_session(self, repo, run):
+        """Track the latest state of a workflow run"""
+        self.sessions[str(run['id'])] = self.session_from_run(repo, run)
+        self.schedule_save()
+    
+    def schedule_save(self):
+        """Save state shortly, coalescing bursts of changes"""
+        self.save_timer.start()
+    
+    def save_state(self):
+        """Persist non-secret dashboard state"""
+        self.save_timer.stop()
+        self.state_store.save(
+            {
+                'repo': self.repo_input.text().strip(),
+                'pool_repos': self.pool_repos_input.text().strip()
+            },
+            self.sessions,
+            self.connection_text
+        )
+    
+    def restore_state(self):
+        """Render the last-known state immediately, then revalidate it"""
+        state = self.state_store.load()
+        if not state:
+            return
+        
+        settings = state.get('settings', {})
+        self.repo_input.setText(settings.get('repo', ''))
+        self.pool_repos_input.setText(settings.get('pool_repos', ''))
+        self.sessions = state.get('sessions', {})
+        
+        saved_at = QtCore.QDateTime.fromSecsSinceEpoch(int(state['saved_at']))
+        for session in self.sessions.values():
+            self.log_message(
+                f"[cached] {session['repo']} run {session['run_id']}: "
+                f"{session.get('conclusion') or session.get('status')}"
+            )
+        
+        connection_text = state.get('connection_info')
+        active = [s for s in self.sessions.values() if s.get('status') != 'completed']
+        if connection_text and active:
+            self.show_connection_info(connection_text, stale=True)
+        self.status_bar.showMessage(
+            f"Showing cached state from {saved_at.toString('yyyy-MM-dd hh:mm')} - refreshing..."
+        )
+        
+        self.revalidate_sessions()
+    
+    def revalidate_sessions(self):
+        """Fetch fresh status of unfinished sessions in the background"""
+        pending = {
+            run_id: session for run_id, session in self.sessions.items()
+            if session.get('status') != 'completed'
+        }
+        if not pending:
+            self.on_revalidated({})
+            return
+        
+        def fetch(ctx):
+            fresh = {}
+            for run_id, session in pending.items():
+                ctx.check_cancelled()
+                owner, name = session['repo'].split('/', 1)
+                run = self.github_auth.get_workflow_run(owner, name, session['run_id'])
+                if run is not None:
+                    fresh[run_id] = self.session_from_run(session['repo'], run)
+            return fresh
+        
+        self.task_runner.submit(
+            fetch,
+            name="State revalidation",
+            on_result=self.on_revalidated,
+            on_error=self.on_revalidation_failed
+        )
+    
+    def on_revalidation_failed(self, error=None):
+        """Keep the cached view until a later revalidation succeeds"""
+        self.revalidation_failed = True
+        self.status_bar.showMessage("Showing cached state - refresh failed")
+    
+    def revalidate_after_sign_in(self):
+        """Retry a revalidation that failed for lack of authentication"""
+        if self.revalidation_failed:
+            self.revalidation_failed = False
+            self.revalidate_sessions()
+    
+    def on_revalidated(self, fresh):
+        """Apply only the sessions that changed since the cached state"""
+        unresolved = [
+            run_id for run_id, session in self.sessions.items()
+            if session.get('status') != 'completed' and run_id not in fresh
+        ]
+        tracked = ('status', 'conclusion', 'html_url')
+        current = {
+            run_id: {k: session.get(k) for k in tracked}
+            for run_id, session in self.sessions.items()
+        }
+        fresh_fields = {
+            run_id: {k: session.get(k) for k in tracked}
+            for run_id, session in fresh.items()
+        }
+        
+        for run_id in diff_sessions(current, fresh_fields):
+            session = fresh[run_id]
+            self.sessions[run_id] = session
+            self.log_message(
+                f"{session['repo']} run {session['run_id']}: "
+                f"{session.get('conclusion') or session.get('status')}"
+            )
+        
+        if unresolved:
+            # Keep showing the cached values rather than guessing
+            self.on_revalidation_failed()
+            return
+        self.revalidation_failed = False
+        
+        active = [s for s in self.sessions.values() if s.get('status') != 'completed']
+        if self.connection_stale:
+            if active:
+                self.show_connection_info(self.connection_text)
+            else:
+                self.show_connection_info("No active session")
+        
+        if not self.github_auth.is_authenticated():
+            self.status_bar.showMessage("Ready - Please authenticate with GitHub")
+        self.schedule_save()
+    
+    def run_provisioning_analytics(self):
+        """Build the provisioning-time report in the background"""
+        repo = self.repo_input.text().strip()
+        if not repo or '/' not in repo:
+            QMessageBox.warning(
+                self, "Warning", 
+                "Please enter a valid repository name (owner/repo)."
+            )
+            return
+        
+        owner, name = repo.split('/', 1)
+        self.analytics_btn.setEnabled(False)
+        self.analytics_text.setPlainText(f"Collecting run history of {repo}...")
+        
+        self.task_runner.submit(
+            lambda ctx: format_report(analyze(collect_timings(self.github_auth, owner, name))),
+            name="Provisioning analytics",
+            on_result=self.analytics_text.setPlainText,
+            on_error=self.analytics_text.setPlainText,
+            on_finished=lambda: self.analytics_btn.setEnabled(True)
+        )
     
     def update_ui_state(self):
         """Update UI based on authentication state"""
-        both_authenticated = bool(self.github_token and self.tailscale_key)
+        both_authenticated = self.github_auth.is_authenticated() and bool(self.tailscale_key)
         self.start_rdp_btn.setEnabled(both_authenticated)
+        self.sync_key_btn.setEnabled(both_authenticated)
+        self.reap_btn.setEnabled(self.github_auth.is_authenticated())
         
         if both_authenticated:
             self.status_bar.showMessage("Ready - You can now start RDP sessions")
@@ -457,8 +1251,14 @@ class TailscaleRDPApp(QMainWindow):
     
     def quit_application(self):
         """Clean shutdown of the application"""
-        if self.workflow_monitor:
-            self.workflow_monitor.stop()
+        self.save_state()
+        for monitor in self.workflow_monitors.values():
+            monitor.stop()
+        if self.oauth_task:
+            self.oauth_task.cancel()
+        if self.app_auth:
+            self.app_auth.stop_auto_refresh()
+        self.task_runner.cancel_all()
         
         QApplication.quit()
     
@@ -482,6 +1282,12 @@ def main():
     # Set application style
     app.setStyle('Fusion')
     
+    # Optional profiling mode (--profile or RDP_MANAGER_PROFILE=1)
+    if profiling_requested(sys.argv):
+        profiler = ProfilingSession(profile_output_dir(sys.argv), parent=app)
+        app.aboutToQuit.connect(profiler.stop)
+        profiler.start()
+    
     # Create and show main window
     window = TailscaleRDPApp()
     window.show()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Profiling Mode
+
+Collects performance data for bug reports, including from the windowed
+PyInstaller build where there is no console:
+
+- cProfile of the GUI thread for the whole session, plus a profile of every
+  background task on the thread pool, merged into one report
+- periodic tracemalloc snapshots, diffed against the first one
+- an event-loop lag sampler measuring QTimer drift
+
+Enable with ``--profile`` (optionally ``--profile-dir=PATH``) or the
+RDP_MANAGER_PROFILE / RDP_MANAGER_PROFILE_DIR environment variables.
+All outputs are written to the profile directory when the app exits.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from threading import Lock
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QObject, QTimer
+
+from task_runner import set_task_wrapper
+
+
+PROFILE_FLAG = '--profile'
+PROFILE_DIR_FLAG = '--profile-dir='
+
+
+def profiling_requested(argv: Sequence[str]) -> bool:
+    """Check the CLI flag and environment variable for profiling mode"""
+    if PROFILE_FLAG in argv or any(arg.startswith(PROFILE_DIR_FLAG) for arg in argv):
+        return True
+    return os.environ.get('RDP_MANAGER_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+def profile_output_dir(argv: Sequence[str]) -> str:
+    """Resolve the directory that profiling outputs are written to"""
+    for arg in argv:
+        if arg.startswith(PROFILE_DIR_FLAG):
+            return arg[len(PROFILE_DIR_FLAG):]
+
+    env_dir = os.environ.get('RDP_MANAGER_PROFILE_DIR')
+    if env_dir:
+        return env_dir
+
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(os.path.expanduser('~'), 'rdp-manager-profiles', stamp)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class EventLoopLagMonitor(QObject):
+    """Measure how late QTimer ticks fire relative to their interval"""
+
+    def __init__(self, interval_ms: int = 100, parent: QObject = None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.samples: List[Tuple[float, float]] = []  # (elapsed s, lag ms)
+        self._started_at = 0.0
+        self._last_tick = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._started_at = self._last_tick = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def rearm(self):
+        """Restart drift measurement, e.g. after the profiler itself blocked"""
+        self._last_tick = time.perf_counter()
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._last_tick) * 1000.0 - self.interval_ms)
+        self.samples.append((now - self._started_at, lag_ms))
+        self._last_tick = now
+
+    def summary(self) -> str:
+        """Format lag percentiles as text"""
+        lags = sorted(lag for _, lag in self.samples)
+        if not lags:
+            return "No event-loop samples recorded\n"
+
+        return (
+            f"samples: {len(lags)} (interval {self.interval_ms} ms)\n"
+            f"p50 lag: {_percentile(lags, 0.50):.1f} ms\n"
+            f"p95 lag: {_percentile(lags, 0.95):.1f} ms\n"
+            f"p99 lag: {_percentile(lags, 0.99):.1f} ms\n"
+            f"max lag: {lags[-1]:.1f} ms\n"
+        )
+
+    def write(self, path: str):
+        """Write the summary followed by raw samples as CSV"""
+        with open(path, 'w', encoding='utf-8') as out:
+            for line in self.summary().splitlines():
+                out.write(f"# {line}\n")
+            out.write("elapsed_s,lag_ms\n")
+            for elapsed, lag in self.samples:
+                out.write(f"{elapsed:.3f},{lag:.2f}\n")
+
+
+class PoolProfiler:
+    """Profile task functions on pool threads and merge their statistics"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.stats: Optional[pstats.Stats] = None
+        self.profiled = 0
+        self.unprofiled = 0
+
+    def __call__(self, fn: Callable, *args):
+        """Run one task function under its own profiler"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows only one active cProfile per interpreter
+            with self._lock:
+                self.unprofiled += 1
+            return fn(*args)
+
+        try:
+            return fn(*args)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.profiled += 1
+                if self.stats is None:
+                    self.stats = pstats.Stats(profiler)
+                else:
+                    self.stats.add(profiler)
+
+    def summary(self) -> str:
+        """One line describing how many tasks were profiled"""
+        text = f"Pool threads: {self.profiled} tasks profiled"
+        if self.unprofiled:
+            text += (
+                f", {self.unprofiled} not profiled "
+                f"(this Python allows one active profiler at a time)"
+            )
+        return text
+
+
+class ProfilingSession(QObject):
+    """Run cProfile, tracemalloc and the lag monitor for one app session"""
+
+    def __init__(self, output_dir: str, snapshot_interval: int = 60,
+                 lag_interval_ms: int = 100, tracemalloc_frames: int = 10,
+                 parent: QObject = None):
+        """
+        Initialize profiling
+
+        Args:
+            output_dir: Directory receiving the output files
+            snapshot_interval: Seconds between tracemalloc snapshots
+            lag_interval_ms: QTimer interval used to sample event-loop lag
+            tracemalloc_frames: Stack depth recorded per allocation
+        """
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self.tracemalloc_frames = tracemalloc_frames
+        self.profiler = cProfile.Profile()
+        self.pool_profiler = PoolProfiler()
+        self.lag_monitor = EventLoopLagMonitor(lag_interval_ms, self)
+
+        # Only formatted reports are kept, not the snapshots themselves
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_reports: List[str] = []
+        self._started_at = 0.0
+        self._stopped = False
+
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setInterval(snapshot_interval * 1000)
+        self.snapshot_timer.timeout.connect(self.take_snapshot)
+
+    def start(self):
+        """Start all collectors"""
+        self._started_at = time.perf_counter()
+        tracemalloc.start(self.tracemalloc_frames)
+        self._baseline = tracemalloc.take_snapshot()
+        self.snapshot_timer.start()
+        self.lag_monitor.start()
+        set_task_wrapper(self.pool_profiler)
+        self.profiler.enable()
+
+    def take_snapshot(self):
+        """Record the top allocation growth since startup"""
+        if not tracemalloc.is_tracing():
+            return
+
+        snapshot_start = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        elapsed = snapshot_start - self._started_at
+
+        lines = [
+            f"=== Snapshot at {elapsed:.0f} s: "
+            f"current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB ==="
+        ]
+        for stat in snapshot.compare_to(self._baseline, 'lineno')[:20]:
+            lines.append(str(stat))
+        del snapshot
+
+        # Taking a snapshot blocks the GUI thread; keep it out of the lag data
+        cost_ms = (time.perf_counter() - snapshot_start) * 1000.0
+        lines.append(f"(snapshot took {cost_ms:.0f} ms, excluded from event-loop lag)")
+        self._snapshot_reports.append("\n".join(lines) + "\n")
+        self.lag_monitor.rearm()
+
+    def stop(self):
+        """Stop collectors and write every output file"""
+        if self._stopped:
+            return
+        self._stopped = True
+
+        self.profiler.disable()
+        set_task_wrapper(None)
+        self.lag_monitor.stop()
+        self.snapshot_timer.stop()
+        self.take_snapshot()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.profiler.dump_stats(os.path.join(self.output_dir, 'profile.pstats'))
+
+        report = io.StringIO()
+        report.write("=== GUI thread ===\n")
+        stats = pstats.Stats(self.profiler, stream=report)
+        stats.sort_stats('cumulative').print_stats(50)
+
+        report.write(f"=== {self.pool_profiler.summary()} ===\n")
+        pool_stats = self.pool_profiler.stats
+        if pool_stats is not None:
+            pool_stats.dump_stats(os.path.join(self.output_dir, 'profile_pool.pstats'))
+            pool_stats.stream = report
+            pool_stats.sort_stats('cumulative').print_stats(50)
+        with open(os.path.join(self.output_dir, 'profile.txt'), 'w', encoding='utf-8') as out:
+            out.write(report.getvalue())
+
+        with open(os.path.join(self.output_dir, 'tracemalloc.txt'), 'w', encoding='utf-8') as out:
+            out.write("\n".join(self._snapshot_reports))
+
+        self.lag_monitor.write(os.path.join(self.output_dir, 'event_loop_lag.csv'))
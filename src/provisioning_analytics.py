@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Provisioning-Time Analytics
+
+Measures where the time goes between dispatching the RDP workflow and the
+session being usable. Uses the GitHub Actions jobs API to collect queue
+time and per-step durations across run history, computes percentiles per
+step, flags steps whose recent runs are slower than their history, and
+formats a ranked report for the app and the command line.
+
+Usage:
+    python provisioning_analytics.py owner/repo [--runs 50]
+
+Authenticates with GITHUB_TOKEN, or as a GitHub App when GITHUB_APP_ID and
+GITHUB_APP_PRIVATE_KEY_PATH are set.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from github_app_auth import GitHubAppAuthError, authenticate_from_environment
+from github_auth import GitHubAuth, WORKFLOW_FILE, parse_timestamp
+
+
+QUEUE_STEP = 'Queue (waiting for runner)'
+
+# Steps that run after the session is already usable
+EXCLUDED_STEPS = {'Keep Session Alive'}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile (fraction between 0 and 1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_timings(run: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Extract queue time and step durations of one run
+
+    Args:
+        run: Workflow run from the runs API
+        jobs: Jobs of that run from the jobs API
+
+    Returns:
+        Dictionary with 'run_id', 'created_at' and 'steps' (name -> seconds)
+    """
+    steps: Dict[str, float] = {}
+
+    for job in jobs:
+        created = parse_timestamp(job.get('created_at'))
+        started = parse_timestamp(job.get('started_at'))
+        if created is not None and started is not None:
+            steps[QUEUE_STEP] = steps.get(QUEUE_STEP, 0.0) + max(0.0, started - created)
+
+        for step in job.get('steps') or []:
+            name = step.get('name', '')
+            if name in EXCLUDED_STEPS:
+                continue
+            if step.get('conclusion') != 'success':
+                continue  # Skipped or cancelled steps did no provisioning work
+            step_start = parse_timestamp(step.get('started_at'))
+            step_end = parse_timestamp(step.get('completed_at'))
+            if step_start is None or step_end is None:
+                continue
+            steps[name] = steps.get(name, 0.0) + max(0.0, step_end - step_start)
+
+    return {
+        'run_id': run.get('id'),
+        'created_at': parse_timestamp(run.get('created_at')) or 0.0,
+        'steps': steps
+    }
+
+
+def collect_timings(auth: GitHubAuth, owner: str, repo: str,
+                    workflow_file: str = WORKFLOW_FILE, max_runs: int = 50,
+                    max_workers: int = 8) -> List[Dict[str, Any]]:
+    """
+    Fetch run history and per-step timings
+
+    Args:
+        auth: Authenticated GitHubAuth
+        owner: Repository owner
+        repo: Repository name
+        workflow_file: Workflow to analyze
+        max_runs: Number of most recent completed runs to include
+        max_workers: Concurrent jobs API requests
+
+    Returns:
+        Timings of each run, oldest first
+    """
+    runs = auth.list_workflow_runs(owner, repo, workflow_file,
+                                   status='completed', max_runs=max_runs)
+    if runs is None:
+        raise RuntimeError(f"Failed to list workflow runs of {owner}/{repo}")
+
+    def fetch(run):
+        jobs = auth.get_workflow_run_jobs(owner, repo, run['id'])
+        return run_timings(run, jobs) if jobs else None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        timings = [t for t in executor.map(fetch, runs) if t and t['steps']]
+
+    timings.sort(key=lambda t: t['created_at'])
+    return timings
+
+
+def analyze(timings: List[Dict[str, Any]], recent: int = 10,
+            regression_ratio: float = 1.2, min_delta: float = 5.0) -> Dict[str, Any]:
+    """
+    Compute per-step percentiles and flag regressions
+
+    A step regresses when its median over the ``recent`` newest runs is
+    more than ``regression_ratio`` times its median over the older runs
+    and at least ``min_delta`` seconds slower.
+
+    Args:
+        timings: Output of collect_timings, oldest first
+        recent: Number of newest runs compared against the rest
+        regression_ratio: Relative slowdown that counts as a regression
+        min_delta: Minimum absolute slowdown in seconds
+
+    Returns:
+        Dictionary with 'runs', 'total_p50' and 'steps' ranked by p50
+    """
+    durations: Dict[str, List[float]] = {}
+    for timing in timings:
+        for name, seconds in timing['steps'].items():
+            durations.setdefault(name, []).append(seconds)
+
+    totals = [sum(t['steps'].values()) for t in timings]
+    total_p50 = percentile(totals, 0.5)
+
+    steps = []
+    for name, values in durations.items():
+        p50 = percentile(values, 0.5)
+        baseline = values[:-recent]
+        latest = values[-recent:]
+        regressed = False
+        if baseline:
+            before = percentile(baseline, 0.5)
+            after = percentile(latest, 0.5)
+            regressed = after > before * regression_ratio and after - before >= min_delta
+
+        steps.append({
+            'name': name,
+            'count': len(values),
+            'p50': p50,
+            'p90': percentile(values, 0.9),
+            'p95': percentile(values, 0.95),
+            'max': max(values),
+            'share': p50 / total_p50 if total_p50 else 0.0,
+            'regressed': regressed
+        })
+
+    steps.sort(key=lambda step: step['p50'], reverse=True)
+    return {'runs': len(timings), 'total_p50': total_p50, 'steps': steps}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format an analysis as a ranked "where the time goes" table"""
+    if not report['runs']:
+        return "No completed runs with step timings found.\n"
+
+    lines = [
+        f"Where the time goes ({report['runs']} runs, "
+        f"median provisioning {report['total_p50']:.0f} s)",
+        "",
+        f"{'#':>2}  {'Step':<44} {'p50':>7} {'p90':>7} {'p95':>7} {'share':>6}",
+    ]
+    for rank, step in enumerate(report['steps'], 1):
+        flag = "  REGRESSED" if step['regressed'] else ""
+        lines.append(
+            f"{rank:>2}  {step['name'][:44]:<44} {step['p50']:>6.1f}s "
+            f"{step['p90']:>6.1f}s {step['p95']:>6.1f}s {step['share']:>6.0%}{flag}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Provisioning-time report for the RDP workflow")
+    parser.add_argument('repo', help="Repository as owner/name")
+    parser.add_argument('--runs', type=int, default=50, help="Number of recent runs to analyze")
+    parser.add_argument('--workflow', default=WORKFLOW_FILE, help="Workflow file name")
+    parser.add_argument('--recent', type=int, default=10,
+                        help="Newest runs compared against older ones for regressions")
+    args = parser.parse_args()
+
+    if '/' not in args.repo:
+        parser.error("repository must be given as owner/name")
+    owner, repo = args.repo.split('/', 1)
+
+    auth = GitHubAuth()
+    auth.access_token = os.environ.get('GITHUB_TOKEN')
+
+    try:
+        app_auth = authenticate_from_environment(auth, args.repo)
+    except GitHubAppAuthError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        timings = collect_timings(auth, owner, repo, args.workflow, args.runs)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if app_auth:
+            app_auth.stop_auto_refresh()
+
+    print(format_report(analyze(timings, recent=args.recent)), end='')
+
+
+if __name__ == '__main__':
+    main()
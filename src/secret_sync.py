@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Repository Secret Sync
+
+Pushes the Tailscale auth key to the TAILSCALE_AUTH_TOKEN Actions secret of
+many repositories at once. Values are encrypted with each repository's
+public key using a libsodium sealed box, as GitHub requires.
+
+To keep a rotation down to the minimum number of API calls:
+
+- public keys are cached per repository (and sealed boxes per key_id) and
+  persisted, so they are only fetched again if GitHub rejects them
+- a keyed hash of the last value pushed to each repository is recorded
+  locally, and repositories that already hold the value are skipped
+- updates run concurrently over a shared connection pool
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import requests
+from nacl import encoding, public
+
+from github_app_auth import GitHubAppAuthError
+from github_auth import GitHubAuth
+
+
+SECRET_NAME = 'TAILSCALE_AUTH_TOKEN'
+
+
+def default_sync_state_path() -> str:
+    """Location of the sync state file in the user's home directory"""
+    return os.path.join(os.path.expanduser('~'), '.windows11-rdp-manager', 'secret_sync.json')
+
+
+class SecretSync:
+    """Bulk-update an Actions secret across repositories"""
+
+    def __init__(self, auth: GitHubAuth, state_path: str = None, max_workers: int = 8):
+        """
+        Initialize secret sync
+
+        Args:
+            auth: Authenticated GitHubAuth (needs repo scope)
+            state_path: File recording public keys and pushed-value hashes
+            max_workers: Maximum concurrent API requests
+        """
+        self.auth = auth
+        self.state_path = state_path or default_sync_state_path()
+        self.max_workers = max_workers
+        self._lock = Lock()
+
+        # Repository -> (key_id, base64 public key)
+        self._public_keys: Dict[str, Tuple[str, str]] = {}
+        # key_id -> SealedBox, so repositories sharing a key reuse one box
+        self._sealed_boxes: Dict[str, public.SealedBox] = {}
+        # "repo/secret" -> keyed hash of the value last pushed there
+        self._pushed: Dict[str, str] = {}
+        # Local random key for the hashes, so the file does not leak the value
+        self._hash_key = b''
+        self._load_state()
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _load_state(self):
+        """Read cached public keys and pushed-value hashes"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+            self._public_keys = {
+                repo: tuple(key) for repo, key in state.get('public_keys', {}).items()
+            }
+            self._pushed = state.get('pushed', {})
+            self._hash_key = base64.b64decode(state.get('hash_key', ''))
+        except (OSError, ValueError):
+            pass
+
+        if not self._hash_key:
+            self._hash_key = secrets.token_bytes(32)
+            self._pushed = {}
+
+    def _save_state(self):
+        """Persist cached public keys and pushed-value hashes"""
+        with self._lock:
+            state = {
+                'hash_key': base64.b64encode(self._hash_key).decode('ascii'),
+                'public_keys': self._public_keys,
+                'pushed': self._pushed
+            }
+
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(state, state_file)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"Failed to save secret sync state: {e}")
+
+    def _value_hash(self, repo: str, name: str, value: str) -> str:
+        """Keyed hash identifying a value pushed to one repository secret"""
+        message = f"{repo}\0{name}\0{value}".encode('utf-8')
+        return hmac.new(self._hash_key, message, hashlib.sha256).hexdigest()
+
+    def get_public_key(self, repo: str, refresh: bool = False) -> Tuple[str, str]:
+        """
+        Get a repository's Actions public key, using the cache when possible
+
+        Args:
+            repo: Repository as owner/name
+            refresh: Ignore the cache (e.g. after GitHub rejected the key)
+
+        Returns:
+            (key_id, base64 public key)
+        """
+        if not refresh:
+            with self._lock:
+                cached = self._public_keys.get(repo)
+            if cached:
+                return cached
+
+        url = f'{self.auth.api_url}/repos/{repo}/actions/secrets/public-key'
+        response = self.session.get(url, headers=self.auth.api_headers(), timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code} fetching public key")
+
+        key_info = response.json()
+        key = (key_info['key_id'], key_info['key'])
+        with self._lock:
+            self._public_keys[repo] = key
+        return key
+
+    def encrypt(self, key_id: str, public_key: str, value: str) -> str:
+        """
+        Encrypt a value with a sealed box for the given public key
+
+        Returns:
+            Base64-encoded ciphertext
+        """
+        with self._lock:
+            box = self._sealed_boxes.get(key_id)
+            if box is None:
+                key = public.PublicKey(public_key.encode('ascii'), encoding.Base64Encoder())
+                box = public.SealedBox(key)
+                self._sealed_boxes[key_id] = box
+
+        return base64.b64encode(box.encrypt(value.encode('utf-8'))).decode('ascii')
+
+    def _put_secret(self, repo: str, name: str, value: str) -> int:
+        """Encrypt and upload one secret, returning the HTTP status"""
+        key_id, public_key = self.get_public_key(repo)
+        payload = {'encrypted_value': self.encrypt(key_id, public_key, value), 'key_id': key_id}
+        url = f'{self.auth.api_url}/repos/{repo}/actions/secrets/{name}'
+        response = self.session.put(url, json=payload, headers=self.auth.api_headers(), timeout=30)
+        return response.status_code
+
+    def push(self, repo: str, name: str, value: str, force: bool = False) -> str:
+        """
+        Update one repository secret unless it already holds the value
+
+        Returns:
+            'updated', 'unchanged' or a failure description
+        """
+        value_hash = self._value_hash(repo, name, value)
+        record_key = f"{repo}/{name}"
+        with self._lock:
+            if not force and hmac.compare_digest(self._pushed.get(record_key, ''), value_hash):
+                return 'unchanged'
+
+        try:
+            status = self._put_secret(repo, name, value)
+            if status in (400, 422):
+                # Cached public key may have been rotated; refetch once
+                self.get_public_key(repo, refresh=True)
+                status = self._put_secret(repo, name, value)
+        except (requests.RequestException, RuntimeError, GitHubAppAuthError) as e:
+            return f"failed: {e}"
+
+        if status not in (201, 204):
+            return f"failed: HTTP {status}"
+
+        with self._lock:
+            self._pushed[record_key] = value_hash
+        return 'updated'
+
+    def sync(self, repos: Iterable[str], value: str, name: str = SECRET_NAME,
+             force: bool = False,
+             progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, str]:
+        """
+        Push a secret to many repositories concurrently
+
+        Args:
+            repos: Repositories as owner/name
+            value: Secret value
+            name: Secret name
+            force: Push even where the recorded hash matches
+            progress: Called with (done, total) as repositories finish
+
+        Returns:
+            Repository -> 'updated', 'unchanged' or a failure description
+        """
+        repos = list(dict.fromkeys(repos))
+        results: Dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.push, repo, name, value, force): repo for repo in repos}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(len(results), len(repos))
+
+        self._save_state()
+        return results
+
+
+def summarize(results: Dict[str, str], elapsed: float) -> str:
+    """One-line summary of a sync result"""
+    updated = sum(1 for result in results.values() if result == 'updated')
+    unchanged = sum(1 for result in results.values() if result == 'unchanged')
+    failed = len(results) - updated - unchanged
+    return (
+        f"Secret sync: {updated} updated, {unchanged} unchanged, "
+        f"{failed} failed in {elapsed:.1f} s"
+    )
+
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Session Placement Scheduler
+
+The RDP workflow uses ``concurrency: cancel-in-progress``, so dispatching
+it twice to the same repository cancels the running session. To run several
+sessions at once, each one needs its own repository (or fork).
+
+SessionScheduler keeps track of which configured repositories hold an
+active run, places each new session on a free repository, queues requests
+when every repository is busy and hands queued requests to repositories as
+their sessions end.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from github_auth import GitHubAuth, WORKFLOW_FILE
+
+
+# Run statuses that hold the workflow's concurrency slot
+ACTIVE_STATUSES = ('queued', 'in_progress', 'waiting', 'pending', 'requested')
+
+
+def find_busy_repos(auth: GitHubAuth, repos: Iterable[str],
+                    workflow_file: str = WORKFLOW_FILE,
+                    max_workers: int = 8) -> Dict[str, Optional[int]]:
+    """
+    Ask GitHub which repositories currently have an active run
+
+    Args:
+        auth: Authenticated GitHubAuth
+        repos: Repositories as owner/name
+        workflow_file: Workflow whose runs occupy a repository
+        max_workers: Concurrent API requests
+
+    Returns:
+        Busy repositories mapped to their active run ID
+    """
+    def check(repo):
+        owner, name = repo.split('/', 1)
+        runs = auth.list_workflow_runs(owner, name, workflow_file, max_runs=10)
+        if runs is None:
+            # Treat unknown state as busy rather than risk cancelling a session
+            return repo, True, None
+        for run in runs:
+            if run.get('status') in ACTIVE_STATUSES:
+                return repo, True, run.get('id')
+        return repo, False, None
+
+    busy = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for repo, is_busy, run_id in executor.map(check, list(repos)):
+            if is_busy:
+                busy[repo] = run_id
+    return busy
+
+
+class SessionScheduler:
+    """Place sessions on free repositories and queue the rest"""
+
+    def __init__(self, repos: Iterable[str] = ()):
+        """
+        Initialize the scheduler
+
+        Args:
+            repos: Repositories (owner/name) that sessions may be placed on
+        """
+        self._lock = Lock()
+        self._ids = itertools.count(1)
+        self.repos: List[str] = []
+        # Repository -> request placed there; external runs use {'external': True}
+        self.assignments: Dict[str, Dict[str, Any]] = {}
+        self.queue: deque = deque()
+        # Last time each repository was released, to spread usage round-robin
+        self._released_at: Dict[str, float] = {}
+        self.set_repos(repos)
+
+    def set_repos(self, repos: Iterable[str]) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Replace the repository pool
+
+        Busy repositories that are removed keep their assignment until
+        released so running sessions are not forgotten.
+
+        Returns:
+            Queued requests placed on newly available repositories
+        """
+        with self._lock:
+            self.repos = list(dict.fromkeys(repos))
+            return self._drain_queue()
+
+    def request(self, payload: Dict[str, Any] = None) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Ask for a session
+
+        Args:
+            payload: Caller data carried with the request (e.g. workflow inputs)
+
+        Returns:
+            (request, repo) where repo is None if the request was queued
+        """
+        with self._lock:
+            request = {
+                'id': next(self._ids),
+                'payload': payload or {},
+                'requested_at': time.time()
+            }
+            repo = self._pick_free_repo()
+            if repo is None:
+                self.queue.append(request)
+            else:
+                self.assignments[repo] = request
+            return request, repo
+
+    def cancel_request(self, request_id: int) -> bool:
+        """
+        Drop a queued request
+
+        Returns:
+            True if the request was still queued
+        """
+        with self._lock:
+            for request in self.queue:
+                if request['id'] == request_id:
+                    self.queue.remove(request)
+                    return True
+            return False
+
+    def release(self, repo: str) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Mark a repository free after its session ended
+
+        Returns:
+            Queued requests placed as a result (at most one per freed repository)
+        """
+        with self._lock:
+            if self.assignments.pop(repo, None) is not None:
+                self._released_at[repo] = time.time()
+            return self._drain_queue()
+
+    def mark_external(self, repo: str, run_id: Optional[int] = None):
+        """
+        Keep a repository reserved until GitHub stops reporting its run
+
+        Used when a session could not be confirmed stopped; sync_busy frees
+        the repository once the run is no longer active.
+
+        Args:
+            repo: Repository as owner/name
+            run_id: Run that may still be active, if known
+        """
+        with self._lock:
+            self.assignments[repo] = {'external': True, 'run_id': run_id}
+
+    def release_run(self, run_id: int) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Free a repository held by an external run once that run has ended
+
+        Returns:
+            Queued requests placed as a result
+        """
+        with self._lock:
+            for repo, assignment in list(self.assignments.items()):
+                if assignment.get('external') and assignment.get('run_id') == run_id:
+                    del self.assignments[repo]
+                    self._released_at[repo] = time.time()
+            return self._drain_queue()
+
+    def sync_busy(self, busy: Dict[str, Optional[int]]) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Reconcile with the active runs reported by GitHub
+
+        Repositories busy with runs this app did not place are marked as
+        external; external assignments that GitHub no longer reports are
+        freed. Sessions placed by this app are left alone, since a freshly
+        dispatched run may not be listed yet.
+
+        Args:
+            busy: Output of find_busy_repos
+
+        Returns:
+            Queued requests placed on repositories that turned out to be free
+        """
+        with self._lock:
+            for repo, run_id in busy.items():
+                if repo not in self.assignments:
+                    self.assignments[repo] = {'external': True, 'run_id': run_id}
+
+            for repo, assignment in list(self.assignments.items()):
+                if assignment.get('external') and repo not in busy:
+                    del self.assignments[repo]
+                    self._released_at[repo] = time.time()
+
+            return self._drain_queue()
+
+    def busy_repos(self) -> Set[str]:
+        """Repositories currently holding a session"""
+        with self._lock:
+            return set(self.assignments)
+
+    def free_repos(self) -> List[str]:
+        """Configured repositories without a session"""
+        with self._lock:
+            return [repo for repo in self.repos if repo not in self.assignments]
+
+    def queue_length(self) -> int:
+        """Number of requests waiting for a repository"""
+        with self._lock:
+            return len(self.queue)
+
+    def _pick_free_repo(self) -> Optional[str]:
+        """Least recently released free repository (caller holds the lock)"""
+        free = [repo for repo in self.repos if repo not in self.assignments]
+        if not free:
+            return None
+        return min(free, key=lambda repo: self._released_at.get(repo, 0.0))
+
+    def _drain_queue(self) -> List[Tuple[Dict[str, Any], str]]:
+        """Place queued requests on free repositories (caller holds the lock)"""
+        placements = []
+        while self.queue:
+            repo = self._pick_free_repo()
+            if repo is None:
+                break
+            request = self.queue.popleft()
+            self.assignments[repo] = request
+            placements.append((request, repo))
+        return placements
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Session Teardown
+
+Stopping a session has to end its GitHub Actions run, otherwise the runner
+stays busy for up to 360 minutes and keeps the repository's concurrency
+slot. This module cancels runs, falls back to force-cancel when a run does
+not stop, polls quickly until GitHub reports a terminal state and measures
+how long that took. It can also reap every orphaned or stale run across a
+set of repositories in parallel.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from github_auth import GitHubAuth, WORKFLOW_FILE, parse_timestamp
+from session_scheduler import ACTIVE_STATUSES
+
+
+# Outcomes after which the run no longer holds the repository
+STOPPED_OUTCOMES = ('cancelled', 'completed', 'already_completed')
+
+# Sessions never outlive the workflow's timeout-minutes (360)
+MAX_SESSION_AGE = 360 * 60
+
+
+def teardown_run(auth: GitHubAuth, repo: str, run_id: int, timeout: float = 120.0,
+                 force_after: float = 15.0,
+                 should_stop: Callable[[], bool] = None) -> Dict[str, Any]:
+    """
+    Cancel a run and wait until it reaches a terminal state
+
+    Polls every 0.5 s at first and backs off to 2 s. If the run is still
+    active ``force_after`` seconds after the cancel request, force-cancel
+    is sent.
+
+    Args:
+        auth: Authenticated GitHubAuth
+        repo: Repository as owner/name
+        run_id: Workflow run ID
+        timeout: Seconds to wait for a terminal state
+        force_after: Seconds before falling back to force-cancel
+        should_stop: Optional callable; waiting is abandoned once it returns True
+
+    Returns:
+        Dictionary with 'repo', 'run_id', 'outcome' ('cancelled',
+        'already_completed', 'completed', 'timeout' or 'failed'),
+        'conclusion', 'forced' and 'latency' in seconds
+    """
+    owner, name = repo.split('/', 1)
+    started = time.perf_counter()
+    result = {'repo': repo, 'run_id': run_id, 'outcome': 'failed',
+              'conclusion': None, 'forced': False, 'latency': 0.0}
+
+    accepted = auth.cancel_workflow_run(owner, name, run_id)
+    if not accepted:
+        # GitHub refuses to cancel runs that already finished
+        run = auth.get_workflow_run(owner, name, run_id)
+        if run and run.get('status') == 'completed':
+            result.update(outcome='already_completed', conclusion=run.get('conclusion'))
+        result['latency'] = time.perf_counter() - started
+        return result
+
+    delay = 0.5
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= timeout or (should_stop and should_stop()):
+            result['outcome'] = 'timeout'
+            break
+
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
+
+        run = auth.get_workflow_run(owner, name, run_id)
+        if run and run.get('status') == 'completed':
+            conclusion = run.get('conclusion')
+            result['conclusion'] = conclusion
+            result['outcome'] = 'cancelled' if conclusion == 'cancelled' else 'completed'
+            break
+
+        if not result['forced'] and time.perf_counter() - started >= force_after:
+            result['forced'] = auth.cancel_workflow_run(owner, name, run_id, force=True)
+
+    result['latency'] = time.perf_counter() - started
+    return result
+
+
+def teardown_runs(auth: GitHubAuth, runs: Iterable[Tuple[str, int]],
+                  max_workers: int = 8, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Tear down several runs in parallel
+
+    Args:
+        auth: Authenticated GitHubAuth
+        runs: (repo, run_id) pairs
+        max_workers: Runs torn down concurrently
+        **kwargs: Passed to teardown_run
+
+    Returns:
+        One teardown_run result per run
+    """
+    runs = list(runs)
+    if not runs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda run: teardown_run(auth, run[0], run[1], **kwargs), runs
+        ))
+
+
+def find_reapable_runs(auth: GitHubAuth, repos: Iterable[str],
+                       keep_run_ids: Set[int] = frozenset(),
+                       max_age: Optional[float] = None,
+                       workflow_file: str = WORKFLOW_FILE,
+                       max_workers: int = 8) -> List[Tuple[str, int]]:
+    """
+    List active runs that no tracked session owns, or that are too old
+
+    Args:
+        auth: Authenticated GitHubAuth
+        repos: Repositories as owner/name
+        keep_run_ids: Runs of sessions that are still wanted
+        max_age: Also reap kept runs older than this many seconds
+        workflow_file: Workflow whose runs are considered
+        max_workers: Concurrent API requests
+
+    Returns:
+        (repo, run_id) pairs to tear down
+    """
+    now = time.time()
+
+    def scan(repo):
+        owner, name = repo.split('/', 1)
+        runs = auth.list_workflow_runs(owner, name, workflow_file, max_runs=30) or []
+        reapable = []
+        for run in runs:
+            if run.get('status') not in ACTIVE_STATUSES:
+                continue
+            orphaned = run.get('id') not in keep_run_ids
+            # Runs whose age cannot be determined are only reaped as orphans
+            created = parse_timestamp(run.get('created_at'))
+            stale = max_age is not None and created is not None and now - created > max_age
+            if orphaned or stale:
+                reapable.append((repo, run['id']))
+        return reapable
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [run for runs in executor.map(scan, list(repos)) for run in runs]
+
+
+def summarize(results: List[Dict[str, Any]]) -> str:
+    """One-line summary of teardown results with latency figures"""
+    if not results:
+        return "Teardown: no runs to stop"
+
+    stopped = [r for r in results if r['outcome'] in STOPPED_OUTCOMES]
+    latencies = sorted(r['latency'] for r in stopped)
+    text = f"Teardown: {len(stopped)}/{len(results)} runs stopped"
+    if latencies:
+        text += (
+            f", median {latencies[len(latencies) // 2]:.1f} s, "
+            f"slowest {latencies[-1]:.1f} s"
+        )
+    forced = sum(1 for r in results if r['forced'])
+    if forced:
+        text += f", {forced} force-cancelled"
+    return text
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Dashboard State Store
+
+Persists the last-known dashboard state (settings, tracked sessions, their
+last statuses and connection info) so the app can render it immediately on
+startup and revalidate it in the background.
+
+Secrets (GitHub token, Tailscale key, RDP password) are never written here.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+STATE_VERSION = 1
+
+
+def default_state_path() -> str:
+    """Location of the state file in the user's home directory"""
+    return os.path.join(os.path.expanduser('~'), '.windows11-rdp-manager', 'state.json')
+
+
+def diff_sessions(old: Dict[str, Dict[str, Any]],
+                  new: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute which sessions changed between two session maps
+
+    Args:
+        old: Sessions keyed by run ID as currently displayed
+        new: Freshly fetched sessions keyed by run ID
+
+    Returns:
+        Sessions from ``new`` that are absent from or different in ``old``
+    """
+    changed = {}
+    for run_id, session in new.items():
+        previous = old.get(run_id)
+        if previous is None or any(previous.get(k) != v for k, v in session.items()):
+            changed[run_id] = session
+    return changed
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid_session(session: Any) -> bool:
+    """Check that a saved session has the fields and types the dashboard uses"""
+    if not isinstance(session, dict):
+        return False
+    repo = session.get('repo')
+    run_id = session.get('run_id')
+    return (
+        isinstance(repo, str) and '/' in repo
+        and isinstance(run_id, int) and not isinstance(run_id, bool)
+        and _is_number(session.get('updated_at'))
+        and all(isinstance(session.get(key), (str, type(None)))
+                for key in ('status', 'conclusion', 'html_url'))
+    )
+
+
+class StateStore:
+    """Load and save dashboard state with size and age limits"""
+
+    def __init__(self, path: str = None, max_bytes: int = 256 * 1024,
+                 max_sessions: int = 50, max_age: int = 7 * 24 * 3600):
+        """
+        Initialize the store
+
+        Args:
+            path: State file path (defaults to ~/.windows11-rdp-manager/state.json)
+            max_bytes: Upper bound on the serialized state size
+            max_sessions: Maximum number of sessions kept
+            max_age: Seconds after which saved state and sessions expire
+        """
+        self.path = path or default_state_path()
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.max_age = max_age
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load saved state
+
+        Returns:
+            State dictionary with a 'saved_at' timestamp, or None if there is
+            no usable state (missing, corrupt, oversized, wrong version or expired)
+        """
+        try:
+            if os.path.getsize(self.path) > self.max_bytes:
+                return None
+            with open(self.path, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return None
+
+        now = time.time()
+        saved_at = state.get('saved_at')
+        if not _is_number(saved_at) or now - saved_at > self.max_age:
+            return None
+
+        # Drop malformed parts rather than failing the whole restore
+        settings = state.get('settings')
+        state['settings'] = {
+            key: value for key, value in settings.items() if isinstance(value, str)
+        } if isinstance(settings, dict) else {}
+
+        if not isinstance(state.get('connection_info'), str):
+            state['connection_info'] = ""
+
+        sessions = state.get('sessions')
+        state['sessions'] = {
+            run_id: session for run_id, session in sessions.items()
+            if _valid_session(session) and now - session['updated_at'] <= self.max_age
+        } if isinstance(sessions, dict) else {}
+        return state
+
+    def save(self, settings: Dict[str, Any], sessions: Dict[str, Dict[str, Any]],
+             connection_info: str = ""):
+        """
+        Save state, trimming the oldest sessions to respect the limits
+
+        Args:
+            settings: Non-secret settings such as the repository
+            sessions: Tracked sessions keyed by run ID
+            connection_info: Last connection info text shown to the user
+        """
+        ordered: List = sorted(
+            sessions.items(), key=lambda item: item[1].get('updated_at', 0), reverse=True
+        )[:self.max_sessions]
+
+        while True:
+            state = {
+                'version': STATE_VERSION,
+                'saved_at': time.time(),
+                'settings': settings,
+                'sessions': dict(ordered),
+                'connection_info': connection_info
+            }
+            data = json.dumps(state, separators=(',', ':'))
+            if len(data.encode('utf-8')) <= self.max_bytes or not ordered:
+                break
+            ordered = ordered[:-1]
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as state_file:
+                state_file.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save state: {e}")
+
+    def clear(self):
+        """Delete saved state"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Background Task Runner
+
+Runs blocking work (GitHub API calls, OAuth callbacks) on a shared
+QThreadPool so the GUI thread never waits on the network. Results, errors
+and progress are delivered back to the GUI thread through Qt signals.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import traceback
+from threading import Event
+from typing import Callable, Generic, Optional, Set, TypeVar
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+T = TypeVar('T')
+
+# Network-bound tasks mostly wait, so allow more than one per core
+DEFAULT_MAX_CONCURRENT = 8
+
+# Optional callable wrapping every task function, e.g. a per-thread profiler
+_task_wrapper: Optional[Callable] = None
+
+
+def set_task_wrapper(wrapper: Optional[Callable]):
+    """
+    Install a wrapper called as ``wrapper(fn, context)`` instead of ``fn(context)``
+
+    Args:
+        wrapper: Wrapper to install, or None to remove it
+    """
+    global _task_wrapper
+    _task_wrapper = wrapper
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task function to stop early after cancellation"""
+
+
+class TaskContext:
+    """Handle passed to task functions for cancellation and progress"""
+
+    def __init__(self, signals: 'TaskSignals'):
+        self._signals = signals
+        self._cancel_event = Event()
+
+    def is_cancelled(self) -> bool:
+        """Check whether the task has been cancelled"""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if the task has been cancelled"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep for up to ``seconds``, waking early on cancellation
+
+        Returns:
+            True if the task was cancelled while waiting
+        """
+        return self._cancel_event.wait(seconds)
+
+    def report_progress(self, percent: int, message: str = ""):
+        """
+        Report task progress to the GUI thread
+
+        Args:
+            percent: Progress from 0 to 100, or -1 if unknown
+            message: Optional human-readable status
+        """
+        if not self._cancel_event.is_set():
+            self._signals.progress.emit(percent, message)
+
+    def cancel(self):
+        """Request cancellation"""
+        self._cancel_event.set()
+
+
+class TaskSignals(QObject):
+    """Signals emitted by a Task (QRunnable cannot define signals itself)"""
+    result = pyqtSignal(object)     # Emits the task function's return value
+    error = pyqtSignal(str)         # Emits error message
+    progress = pyqtSignal(int, str)  # Emits percent, message
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()         # Always emitted last
+
+
+class Task(QRunnable, Generic[T]):
+    """Cancellable unit of work executed on the thread pool"""
+
+    def __init__(self, fn: Callable[[TaskContext], T], name: str = ""):
+        """
+        Create a task
+
+        Args:
+            fn: Callable taking a TaskContext and returning the result
+            name: Label used in error messages
+        """
+        super().__init__()
+        self.fn = fn
+        self.name = name or getattr(fn, '__name__', 'task')
+        self.signals = TaskSignals()
+        self.context = TaskContext(self.signals)
+
+    def run(self):
+        """Execute the task function on a pool thread"""
+        try:
+            if self.context.is_cancelled():
+                self.signals.cancelled.emit()
+                return
+
+            wrapper = _task_wrapper
+            if wrapper:
+                result = wrapper(self.fn, self.context)
+            else:
+                result = self.fn(self.context)
+
+            if self.context.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            traceback.print_exc()
+            if not self.context.is_cancelled():
+                self.signals.error.emit(f"{self.name}: {e}")
+            else:
+                self.signals.cancelled.emit()
+        finally:
+            self.signals.finished.emit()
+
+    def cancel(self):
+        """Request cancellation; the result will not be delivered"""
+        self.context.cancel()
+
+    def is_cancelled(self) -> bool:
+        """Check whether cancellation was requested"""
+        return self.context.is_cancelled()
+
+
+class TaskRunner(QObject):
+    """Submits tasks to a QThreadPool and tracks them until they finish"""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 pool: Optional[QThreadPool] = None, parent: QObject = None):
+        """
+        Initialize the runner
+
+        Args:
+            max_concurrent: Maximum number of tasks running at the same time
+            pool: Thread pool to use (defaults to the global pool)
+            parent: Optional Qt parent object
+        """
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(max_concurrent)
+        self._tasks: Set[Task] = set()
+
+    def submit(self, fn: Callable[[TaskContext], T], name: str = "",
+               on_result: Callable[[T], None] = None,
+               on_error: Callable[[str], None] = None,
+               on_progress: Callable[[int, str], None] = None,
+               on_finished: Callable[[], None] = None) -> Task[T]:
+        """
+        Queue a task for execution
+
+        Callbacks are connected before the task starts and run on the
+        thread that called submit (normally the GUI thread).
+
+        Args:
+            fn: Callable taking a TaskContext and returning the result
+            name: Label used in error messages
+            on_result: Called with the return value on success
+            on_error: Called with an error message on failure
+            on_progress: Called with (percent, message) progress reports
+            on_finished: Called after the task ends, whatever the outcome
+
+        Returns:
+            The submitted Task, which can be cancelled
+        """
+        task: Task[T] = Task(fn, name)
+        task.setAutoDelete(False)
+
+        if on_result:
+            task.signals.result.connect(on_result)
+        if on_error:
+            task.signals.error.connect(on_error)
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        task.signals.finished.connect(lambda: self._tasks.discard(task))
+
+        # Keep a reference so the signals object outlives the pool thread
+        self._tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    def active_count(self) -> int:
+        """Number of tasks submitted and not yet finished"""
+        return len(self._tasks)
+
+    def cancel_all(self):
+        """Request cancellation of every pending and running task"""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """
+        Block until all pool threads are idle (use only at shutdown)
+
+        Returns:
+            True if all tasks finished within the timeout
+        """
+        return self.pool.waitForDone(msecs)
+
+
+_shared_runner: Optional[TaskRunner] = None
+
+
+def shared_runner() -> TaskRunner:
+    """Return the application-wide TaskRunner, creating it on first use"""
+    global _shared_runner
+    if _shared_runner is None:
+        _shared_runner = TaskRunner()
+    return _shared_runner
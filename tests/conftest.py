@@ -0,0 +1,24 @@
+"""
+Test configuration
+
+The application modules live flat in src/ and import each other by name,
+so src/ is put on the import path. Qt runs on the offscreen platform.
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """Shared QApplication for tests that need an event loop"""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
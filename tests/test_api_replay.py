@@ -0,0 +1,80 @@
+"""
+Regression benchmarks replaying recorded GitHub traffic
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import os
+
+import pytest
+
+from api_replay import (
+    ReplayServer, bench_app, bench_auth, load_fixture, shift_timestamps, start_server
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'rdp_session.json.gz')
+REPO = 'octocat/rdp'
+
+# Budget for dispatch-to-ready with recorded latencies removed
+MAX_DISPATCH_TO_READY = 5.0
+
+
+def age_fixture(fixture, seconds):
+    """Pretend the fixture was recorded ``seconds`` earlier"""
+    exchanges = [
+        dict(exchange, body=shift_timestamps(exchange['body'], -seconds))
+        if exchange['encoding'] == 'json' else exchange
+        for exchange in fixture['exchanges']
+    ]
+    return {'exchanges': exchanges, 'recorded_at': fixture['recorded_at'] - seconds}
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    """Start a replay server for a fixture and point GitHubAuth at it"""
+    servers = []
+
+    def start(fixture):
+        server = ReplayServer(fixture, scale=0)
+        start_server(server)
+        monkeypatch.setenv('GITHUB_API_URL', f"{server.base_url}/api")
+        monkeypatch.setenv('GITHUB_SERVER_URL', f"{server.base_url}/web")
+        monkeypatch.delenv('GITHUB_APP_ID', raising=False)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_shift_timestamps_keeps_format():
+    """Shifted timestamps keep the style GitHub used"""
+    data = {'created_at': '2024-05-01T10:00:00Z', 'nested': ['2024-05-01T10:00:00.000-08:00'],
+            'name': 'not a timestamp'}
+    shifted = shift_timestamps(data, 3600)
+    assert shifted == {'created_at': '2024-05-01T11:00:00Z',
+                       'nested': ['2024-05-01T11:00:00.000-08:00'],
+                       'name': 'not a timestamp'}
+
+
+def test_auth_flows_replay_without_misses(replay):
+    """OAuth, dispatch and polling are served entirely from the fixture"""
+    server = replay(load_fixture(FIXTURE))
+
+    timings = bench_auth(server, 'octocat', 'rdp', iterations=2)
+
+    assert all(len(samples) == 2 for samples in timings.values())
+    assert server.misses == []
+
+
+@pytest.mark.parametrize('age', [0, 3600, 30 * 86400])
+def test_dispatch_to_ready_within_budget(qapp, replay, age):
+    """The app reaches a running session in time, however old the fixture is"""
+    server = replay(age_fixture(load_fixture(FIXTURE), age))
+
+    result = bench_app(server, REPO, timeout=MAX_DISPATCH_TO_READY * 2)
+
+    assert 0 <= result['dispatch_to_ready'] <= MAX_DISPATCH_TO_READY
+    assert server.misses == []
@@ -0,0 +1,155 @@
+"""
+Tests for resumable artifact and log downloads
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from artifact_cache import INFO_ARTIFACT, INFO_MEMBER, ArtifactCache
+from github_auth import GitHubAuth
+
+
+def make_zip(text):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('log.txt', text)
+    return buffer.getvalue()
+
+
+class ArchiveServer:
+    """Serves one archive with ETag, Range and If-Range support"""
+
+    def __init__(self):
+        self.body = make_zip('first version')
+        self.etag = '"v1"'
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                body = server.body
+                start = 0
+                range_header = self.headers.get('Range')
+                if range_header and self.headers.get('If-Range') in (None, server.etag):
+                    start = int(range_header.split('=')[1].rstrip('-'))
+                self.send_response(206 if start else 200)
+                self.send_header('ETag', server.etag)
+                self.send_header('Content-Length', str(len(body) - start))
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+
+
+@pytest.fixture
+def server():
+    archive_server = ArchiveServer()
+    yield archive_server
+    archive_server.httpd.shutdown()
+
+
+@pytest.fixture
+def cache(server, tmp_path):
+    auth = GitHubAuth()
+    auth.api_url = server.url
+    return ArtifactCache(auth, cache_dir=str(tmp_path))
+
+
+def write_partial(cache, name, data, validator=None):
+    partial_dir = os.path.join(cache.cache_dir, 'partial')
+    os.makedirs(partial_dir, exist_ok=True)
+    with open(os.path.join(partial_dir, name), 'wb') as partial:
+        partial.write(data)
+    if validator:
+        with open(os.path.join(partial_dir, name + '.validator'), 'w') as validator_file:
+            validator_file.write(validator)
+
+
+def test_resume_appends_to_unchanged_archive(cache, server):
+    """A partial file with a matching validator is resumed with If-Range"""
+    write_partial(cache, 'logs-1.part', server.body[:10], '"v1"')
+
+    path = cache.fetch_logs('me/rdp', 1, completed=True)
+
+    assert server.requests[-1]['Range'] == 'bytes=10-'
+    assert server.requests[-1]['If-Range'] == '"v1"'
+    assert os.path.basename(path) == hashlib.sha256(server.body).hexdigest() + '.zip'
+
+
+def test_changed_archive_is_downloaded_again(cache, server):
+    """A partial file of an older archive is not spliced onto the new one"""
+    write_partial(cache, 'logs-1.part', server.body[:10], '"v1"')
+    server.body = make_zip('second version, regenerated')
+    server.etag = '"v2"'
+
+    path = cache.fetch_logs('me/rdp', 1, completed=True)
+
+    assert os.path.basename(path) == hashlib.sha256(server.body).hexdigest() + '.zip'
+    assert cache.read_member(path, 'log.txt') == b'second version, regenerated'
+
+
+def test_logs_of_unfinished_runs_are_never_resumed(cache, server):
+    """Partial logs of a running job are discarded instead of resumed"""
+    write_partial(cache, 'logs-1.part', server.body[:10], '"v1"')
+
+    cache.fetch_logs('me/rdp', 1, completed=False)
+
+    assert 'Range' not in server.requests[-1]
+    assert not os.listdir(os.path.join(cache.cache_dir, 'partial'))
+
+
+def files_containing(directory, needle):
+    found = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            with open(os.path.join(root, name), 'rb') as content:
+                if needle in content.read():
+                    found.append(name)
+    return found
+
+
+@pytest.fixture
+def info_artifact(cache, server, monkeypatch):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(INFO_MEMBER, '\ufeffTailscale IP: 100.64.0.1\nPassword: hunter2\n')
+    server.body = buffer.getvalue()
+    monkeypatch.setattr(cache, 'list_artifacts', lambda repo, run_id: [
+        {'id': 5, 'name': INFO_ARTIFACT, 'expired': False,
+         'archive_download_url': f'{server.url}/artifacts/5/zip'}
+    ])
+
+
+def test_connection_info_is_not_kept_on_disk(cache, info_artifact):
+    """The plaintext password is deleted as soon as it has been read"""
+    text = cache.connection_info('me/rdp', 1)
+
+    assert text == 'Tailscale IP: 100.64.0.1\nPassword: hunter2'
+    assert files_containing(cache.cache_dir, b'hunter2') == []
+    assert cache.lookup('me/rdp', 1, INFO_ARTIFACT) is None
+    assert cache._objects == {}
+
+
+def test_previously_cached_connection_info_is_purged(cache, info_artifact):
+    cache.fetch_artifact('me/rdp', 1, INFO_ARTIFACT)
+    assert files_containing(cache.cache_dir, b'hunter2')
+
+    reopened = ArtifactCache(cache.auth, cache_dir=cache.cache_dir)
+
+    assert files_containing(cache.cache_dir, b'hunter2') == []
+    assert reopened.lookup('me/rdp', 1, INFO_ARTIFACT) is None
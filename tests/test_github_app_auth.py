@@ -0,0 +1,130 @@
+"""
+Tests for GitHub App installation-token authentication
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from github_app_auth import GitHubAppAuth, GitHubAppAuthError
+
+
+class TokenServer:
+    """Stub of the installation access token endpoint"""
+
+    def __init__(self):
+        self.mints = 0
+        self.lifetime = 3600
+        self.delay = 0.0
+        self.body = None  # Overrides the response body when set
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server.mints += 1
+                time.sleep(server.delay)
+                expires_at = time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + server.lifetime)
+                )
+                body = server.body or json.dumps(
+                    {'token': f'ghs_{server.mints}', 'expires_at': expires_at}
+                ).encode()
+                self.send_response(201)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+
+
+@pytest.fixture(scope='module')
+def private_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+
+
+@pytest.fixture
+def server():
+    token_server = TokenServer()
+    yield token_server
+    token_server.httpd.shutdown()
+
+
+@pytest.fixture
+def app_auth(server, private_key):
+    return GitHubAppAuth(1, private_key, api_url=server.url, refresh_margin=600)
+
+
+def test_concurrent_cold_callers_mint_once(app_auth, server):
+    """Threads asking for the same installation share one exchange"""
+    server.delay = 0.2
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(app_auth.get_token(7)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.mints == 1
+    assert tokens == ['ghs_1'] * 8
+
+
+def test_cached_token_is_reused(app_auth, server):
+    """A valid token is served from the cache"""
+    assert app_auth.get_token(7) == 'ghs_1'
+    assert app_auth.get_token(7) == 'ghs_1'
+    assert server.mints == 1
+
+
+def test_refresh_due_remints_inside_margin(app_auth, server):
+    """Tokens expiring within refresh_margin are replaced by the refresher"""
+    server.lifetime = 300  # Already inside the 600 s margin
+    app_auth.get_token(7)
+    server.lifetime = 3600
+
+    delay = app_auth.refresh_due()
+
+    assert server.mints == 2
+    assert app_auth.get_token(7) == 'ghs_2'
+    assert delay > 1.0
+
+
+def test_unexpected_token_response_raises_auth_error(app_auth, server):
+    """A malformed body is reported as GitHubAppAuthError, not KeyError"""
+    server.body = b'{"unexpected": true}'
+    with pytest.raises(GitHubAppAuthError):
+        app_auth.get_token(7)
+
+    server.body = b'not json'
+    with pytest.raises(GitHubAppAuthError):
+        app_auth.get_token(7)
+
+
+def test_refresher_survives_malformed_response(app_auth, server):
+    """refresh_due retries later instead of dying on a bad response"""
+    server.lifetime = 300
+    app_auth.get_token(7)
+    server.body = b'{"token": "ghs_x"}'
+
+    assert app_auth.refresh_due() == 30.0
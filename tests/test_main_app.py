@@ -0,0 +1,294 @@
+"""
+Tests for session placement in the main window
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import pytest
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    """Main window with a throwaway home directory and no background tasks"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    monkeypatch.delenv('GITHUB_APP_ID', raising=False)
+
+    from main_app import TailscaleRDPApp
+    app_window = TailscaleRDPApp()
+    app_window.github_auth.access_token = 'test'
+    app_window.tailscale_key = 'tskey-test'
+    app_window.dispatched = []
+    monkeypatch.setattr(app_window.task_runner, 'submit', lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        app_window, 'dispatch_session',
+        lambda repo, request: app_window.dispatched.append((repo, request['id']))
+    )
+    yield app_window
+    app_window.save_timer.stop()
+    app_window.queue_timer.stop()
+
+
+def test_start_dispatches_queued_request_on_new_fork(window):
+    """Adding a fork and pressing Start places the queued request on it"""
+    window.repo_input.setText('me/rdp')
+    window.scheduler.set_repos(['me/rdp'])
+    window.scheduler.sync_busy({'me/rdp': 1})
+    queued, repo = window.scheduler.request({})
+    assert repo is None
+
+    window.pool_repos_input.setText('me/rdp-fork')
+    window.start_rdp_session()
+
+    assert window.dispatched == [('me/rdp-fork', queued['id'])]
+    assert window.scheduler.queue_length() == 0
+
+
+def test_teardown_keeps_repository_until_stop_is_confirmed(window):
+    """A run that did not stop keeps its repository away from queued requests"""
+    window.scheduler.set_repos(['me/a', 'me/b'])
+    first, _ = window.scheduler.request({})
+    second, _ = window.scheduler.request({})
+    queued, repo = window.scheduler.request({})
+    assert repo is None
+
+    results = [
+        {'repo': 'me/a', 'run_id': 1, 'outcome': 'timeout', 'forced': True,
+         'conclusion': None, 'latency': 120.0},
+        {'repo': 'me/b', 'run_id': 2, 'outcome': 'cancelled', 'forced': False,
+         'conclusion': 'cancelled', 'latency': 4.0},
+    ]
+    window.on_teardown_done(['me/a', 'me/b'], results)
+
+    assert window.dispatched == [('me/b', queued['id'])]
+    assert window.scheduler.assignments['me/a'] == {'external': True, 'run_id': 1}
+
+    # Freed once GitHub no longer reports the run as active
+    window.scheduler.sync_busy({'me/b': 3})
+    assert 'me/a' not in window.scheduler.assignments
+
+
+def test_reap_skips_repositories_with_freshly_dispatched_sessions(window, monkeypatch):
+    """Runs of sessions whose run ID is not known yet are never reaped"""
+    import main_app
+
+    scanned = []
+    monkeypatch.setattr(
+        main_app, 'find_reapable_runs',
+        lambda auth, repos, keep_run_ids, max_age: scanned.append((list(repos), max_age)) or []
+    )
+    monkeypatch.setattr(main_app, 'teardown_runs', lambda *args, **kwargs: [])
+    monkeypatch.setattr(
+        window.task_runner, 'submit', lambda fn, **kwargs: fn(type('Ctx', (), {
+            'check_cancelled': lambda self: None, 'is_cancelled': lambda self: False
+        })())
+    )
+
+    window.repo_input.setText('me/a')
+    window.pool_repos_input.setText('me/b, me/c')
+    window.scheduler.set_repos(['me/a', 'me/b', 'me/c'])
+    window.scheduler.request({})  # Placed on me/a, no monitor yet
+    window.scheduler.sync_busy({'me/c': 9})
+
+    window.reap_stale_runs()
+
+    assert scanned == [(['me/b', 'me/c'], 360 * 60)]
+
+
+class SyncContext:
+    """Task context for running task functions inline"""
+
+    def is_cancelled(self):
+        return False
+
+    def check_cancelled(self):
+        pass
+
+
+def run_inline(fn, name="", on_result=None, on_error=None, on_progress=None, on_finished=None):
+    """Stand-in for TaskRunner.submit that runs the task immediately"""
+    try:
+        result = fn(SyncContext())
+    except Exception as e:
+        if on_error:
+            on_error(str(e))
+    else:
+        if on_result:
+            on_result(result)
+    if on_finished:
+        on_finished()
+
+
+def test_quick_restart_ignores_the_cancelled_run(window, monkeypatch):
+    """A new session does not adopt the run of the session stopped just before"""
+    import time
+    from main_app import TailscaleRDPApp
+
+    def run(run_id, status, age):
+        created = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - age))
+        return {'id': run_id, 'status': status, 'conclusion': None,
+                'path': '.github/workflows/tailscale-rdp.yml', 'created_at': created}
+
+    cancelled = dict(run(1, 'completed', 40), conclusion='cancelled')
+    runs = [cancelled]
+    auth = window.github_auth
+    monkeypatch.setattr(auth, 'list_workflow_runs', lambda *args, **kwargs: list(runs))
+    monkeypatch.setattr(auth, 'get_workflow_runs', lambda *args, **kwargs: list(runs))
+    monkeypatch.setattr(auth, 'trigger_workflow', lambda *args, **kwargs: True)
+    monkeypatch.setattr(window.task_runner, 'submit', run_inline)
+    monkeypatch.setattr(window, 'record_session', lambda repo, run: None)
+
+    window.scheduler.set_repos(['me/rdp'])
+    request, repo = window.scheduler.request({})
+    TailscaleRDPApp.dispatch_session(window, repo, request)
+
+    monitor = window.workflow_monitors['me/rdp']
+    assert monitor.run_id is None
+    assert window.scheduler.assignments['me/rdp'] is request
+
+    runs.insert(0, run(2, 'queued', 0))
+    monitor.poll()
+
+    assert monitor.run_id == 2
+    assert window.scheduler.assignments['me/rdp'] is request
+    monitor.stop()
+
+
+def test_app_starts_with_malformed_state_file(qapp, tmp_path, monkeypatch):
+    """A damaged state file must not keep the app from starting"""
+    import json
+    import os
+    import time
+
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    monkeypatch.delenv('GITHUB_APP_ID', raising=False)
+    state_dir = tmp_path / '.windows11-rdp-manager'
+    os.makedirs(state_dir)
+    with open(state_dir / 'state.json', 'w', encoding='utf-8') as state_file:
+        json.dump({'version': 1, 'saved_at': time.time(), 'settings': {'repo': 'me/rdp'},
+                   'sessions': {'1': {'run_id': 1, 'status': 'queued'}}}, state_file)
+
+    from main_app import TailscaleRDPApp
+    app_window = TailscaleRDPApp()
+
+    assert app_window.repo_input.text() == 'me/rdp'
+    assert app_window.sessions == {}
+    app_window.save_timer.stop()
+
+
+def test_sign_in_retries_failed_revalidation(window, monkeypatch):
+    """Sessions that could not be refreshed before sign-in are refreshed after it"""
+    import time
+
+    window.sessions = {'5': {'repo': 'me/rdp', 'run_id': 5, 'status': 'in_progress',
+                             'conclusion': None, 'html_url': '', 'updated_at': time.time()}}
+    window.on_revalidated({})  # Unauthenticated lookups found nothing
+    assert window.revalidation_failed
+
+    monkeypatch.setattr(window.task_runner, 'submit', run_inline)
+    monkeypatch.setattr(
+        window.github_auth, 'get_workflow_run',
+        lambda owner, repo, run_id: {'id': run_id, 'status': 'completed',
+                                     'conclusion': 'success', 'html_url': ''}
+    )
+    window.on_oauth_completed({'login': 'me'})
+
+    assert not window.revalidation_failed
+    assert window.sessions['5']['status'] == 'completed'
+
+
+class CapturingRunner:
+    """Stand-in for TaskRunner.submit that keeps tasks for the test to finish"""
+
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn, name="", **callbacks):
+        self.tasks.append((name, fn, callbacks))
+
+    def finish(self, name, result):
+        for index, (task_name, fn, callbacks) in enumerate(self.tasks):
+            if task_name == name:
+                del self.tasks[index]
+                callbacks['on_result'](result)
+                return
+        raise AssertionError(f"No pending task named {name}")
+
+
+def test_stop_before_availability_check_cancels_the_start(window, monkeypatch):
+    """A Start still checking repository availability is dropped by Stop"""
+    runner = CapturingRunner()
+    monkeypatch.setattr(window.task_runner, 'submit', runner.submit)
+    window.repo_input.setText('me/rdp')
+
+    window.start_rdp_session()
+    window.stop_rdp_session()
+    runner.finish("Repository availability", {})
+
+    assert window.dispatched == []
+    assert window.scheduler.assignments == {}
+
+
+def test_stop_during_dispatch_tears_down_the_new_run(window, monkeypatch):
+    """A dispatch in flight when Stop is pressed is cancelled once it returns"""
+    from main_app import TailscaleRDPApp
+
+    runner = CapturingRunner()
+    monkeypatch.setattr(window.task_runner, 'submit', runner.submit)
+    late_stops = []
+    monkeypatch.setattr(window, 'stop_late_dispatch',
+                        lambda repo, known: late_stops.append((repo, known)))
+
+    window.scheduler.set_repos(['me/a', 'me/b'])
+    first, _ = window.scheduler.request({})
+    second, _ = window.scheduler.request({})
+    TailscaleRDPApp.dispatch_session(window, 'me/a', first)
+    TailscaleRDPApp.dispatch_session(window, 'me/b', second)
+
+    window.stop_rdp_session()
+    runner.finish("Workflow dispatch", (True, {1}))
+    runner.finish("Workflow dispatch", (False, set()))
+
+    assert window.workflow_monitors == {}
+    assert late_stops == [('me/a', {1})]
+    # The failed dispatch frees its repository; the other waits for teardown
+    assert list(window.scheduler.assignments) == ['me/a']
+
+
+def test_late_dispatch_teardown_cancels_only_the_new_run(window, monkeypatch):
+    """The run created by a stopped dispatch is found and cancelled"""
+    import main_app
+
+    torn_down = []
+    monkeypatch.setattr(window.task_runner, 'submit', run_inline)
+    monkeypatch.setattr(window.github_auth, 'list_workflow_runs', lambda *args, **kwargs: [
+        {'id': 2, 'status': 'queued'}, {'id': 1, 'status': 'in_progress'}
+    ])
+    monkeypatch.setattr(main_app, 'teardown_runs', lambda auth, runs, **kwargs: torn_down.extend(runs) or [
+        {'repo': repo, 'run_id': run_id, 'outcome': 'cancelled', 'conclusion': 'cancelled',
+         'forced': False, 'latency': 1.0} for repo, run_id in runs
+    ])
+
+    window.scheduler.set_repos(['me/a'])
+    window.scheduler.request({})
+    window.stop_late_dispatch('me/a', {1})
+
+    assert torn_down == [('me/a', 2)]
+    assert window.scheduler.assignments == {}
+
+
+def test_force_sync_checkbox_forces_the_push(window, monkeypatch):
+    calls = []
+    monkeypatch.setattr(window.task_runner, 'submit', run_inline)
+    monkeypatch.setattr(window.secret_sync, 'sync', lambda repos, key, force=False, progress=None:
+                        calls.append(force) or {repo: 'updated' for repo in repos})
+    window.tailscale_key = 'tskey-auth-1'
+    monkeypatch.setattr(window, 'configured_repos', lambda: ['me/a'])
+
+    window.sync_tailscale_key()
+    window.force_sync_check.setChecked(True)
+    window.sync_tailscale_key()
+
+    assert calls == [False, True]
@@ -0,0 +1,41 @@
+"""
+Tests for provisioning-time analytics
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+from github_auth import parse_timestamp
+from provisioning_analytics import QUEUE_STEP, run_timings
+
+
+def test_parse_timestamp_accepts_offsets_and_fractions():
+    """GitHub's documented step timestamp formats all parse to the same instant"""
+    expected = parse_timestamp('2020-01-20T17:42:40Z')
+    assert parse_timestamp('2020-01-20T09:42:40.000-08:00') == expected
+    assert parse_timestamp('2020-01-20T17:42:40.000+00:00') == expected
+    assert parse_timestamp('not a timestamp') is None
+    assert parse_timestamp(None) is None
+
+
+def test_run_timings_counts_only_successful_steps():
+    """Skipped, cancelled and unparsable steps do not add samples"""
+    run = {'id': 1, 'created_at': '2020-01-20T17:00:00Z'}
+    jobs = [{
+        'created_at': '2020-01-20T17:00:00Z',
+        'started_at': '2020-01-20T09:01:00.000-08:00',
+        'steps': [
+            {'name': 'Install Tailscale', 'conclusion': 'success',
+             'started_at': '2020-01-20T17:01:00Z', 'completed_at': '2020-01-20T17:01:30Z'},
+            {'name': 'Optional Step', 'conclusion': 'skipped',
+             'started_at': '2020-01-20T17:01:30Z', 'completed_at': '2020-01-20T17:01:30Z'},
+            {'name': 'Cancelled Step', 'conclusion': 'cancelled',
+             'started_at': '2020-01-20T17:01:30Z', 'completed_at': '2020-01-20T17:01:31Z'},
+            {'name': 'Broken Step', 'conclusion': 'success',
+             'started_at': 'garbage', 'completed_at': '2020-01-20T17:02:00Z'},
+        ]
+    }]
+
+    timings = run_timings(run, jobs)
+
+    assert timings['steps'] == {QUEUE_STEP: 60.0, 'Install Tailscale': 30.0}
@@ -0,0 +1,153 @@
+"""
+Tests for bulk repository secret sync
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from nacl import encoding, public
+
+from github_auth import GitHubAuth
+from secret_sync import SecretSync
+
+
+class SecretsServer:
+    """Stub of the Actions secrets endpoints for any repository"""
+
+    def __init__(self):
+        self.key_id = 'key-1'
+        self.private_key = public.PrivateKey.generate()
+        self.key_gets = 0
+        self.puts = []
+        self.reject_puts = 0  # Number of PUTs to answer with 422
+        self.delay = 0.0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.key_gets += 1
+                    key_id = server.key_id
+                    key = server.private_key.public_key.encode(encoding.Base64Encoder()).decode()
+                self.send_json(200, {'key_id': key_id, 'key': key})
+
+            def do_PUT(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server.lock:
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.active -= 1
+                    server.puts.append((self.path, payload))
+                    rejected = server.reject_puts > 0 or payload['key_id'] != server.key_id
+                    server.reject_puts = max(server.reject_puts - 1, 0)
+                self.send_json(422 if rejected else 201, {})
+
+            def send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+
+    def rotate_key(self):
+        with self.lock:
+            self.key_id = 'key-2'
+            self.private_key = public.PrivateKey.generate()
+
+    def decrypt(self, payload):
+        box = public.SealedBox(self.private_key)
+        return box.decrypt(payload['encrypted_value'].encode(), encoding.Base64Encoder()).decode()
+
+
+@pytest.fixture
+def server():
+    secrets_server = SecretsServer()
+    yield secrets_server
+    secrets_server.httpd.shutdown()
+
+
+@pytest.fixture
+def make_sync(server, tmp_path):
+    auth = GitHubAuth()
+    auth.api_url = server.url
+    auth.access_token = 'gho_test'
+
+    def make(max_workers=8):
+        return SecretSync(auth, state_path=str(tmp_path / 'secret_sync.json'), max_workers=max_workers)
+    return make
+
+
+def test_matching_hash_is_skipped(make_sync, server):
+    """A second sync of the same value makes no requests at all"""
+    sync = make_sync()
+    assert sync.sync(['me/a', 'me/b'], 'tskey-auth-1') == {'me/a': 'updated', 'me/b': 'updated'}
+    assert server.decrypt(server.puts[0][1]) == 'tskey-auth-1'
+    requests_made = (server.key_gets, len(server.puts))
+
+    assert sync.sync(['me/a', 'me/b'], 'tskey-auth-1') == {'me/a': 'unchanged', 'me/b': 'unchanged'}
+    assert (server.key_gets, len(server.puts)) == requests_made
+
+
+def test_force_pushes_despite_matching_hash(make_sync, server):
+    sync = make_sync()
+    sync.sync(['me/a'], 'tskey-auth-1')
+
+    assert sync.sync(['me/a'], 'tskey-auth-1', force=True) == {'me/a': 'updated'}
+    assert len(server.puts) == 2
+
+
+def test_public_key_is_cached_across_instances(make_sync, server):
+    """A new value is pushed with the persisted key, without a public-key GET"""
+    make_sync().sync(['me/a'], 'tskey-auth-1')
+    assert server.key_gets == 1
+
+    assert make_sync().sync(['me/a'], 'tskey-auth-2') == {'me/a': 'updated'}
+    assert server.key_gets == 1
+    assert server.decrypt(server.puts[-1][1]) == 'tskey-auth-2'
+
+
+def test_rejected_key_is_refetched_once(make_sync, server):
+    """A 422 after key rotation leads to one refetch and one retry"""
+    make_sync().sync(['me/a'], 'tskey-auth-1')
+    server.rotate_key()
+
+    assert make_sync().sync(['me/a'], 'tskey-auth-2') == {'me/a': 'updated'}
+    assert server.key_gets == 2
+    assert [payload['key_id'] for _, payload in server.puts[1:]] == ['key-1', 'key-2']
+    assert server.decrypt(server.puts[-1][1]) == 'tskey-auth-2'
+
+
+def test_persistent_rejection_fails_after_one_retry(make_sync, server):
+    server.reject_puts = 5
+
+    assert make_sync().sync(['me/a'], 'tskey-auth-1') == {'me/a': 'failed: HTTP 422'}
+    assert len(server.puts) == 2
+
+
+def test_concurrency_stays_within_max_workers(make_sync, server):
+    server.delay = 0.05
+    repos = [f'me/fork-{index}' for index in range(12)]
+
+    results = make_sync(max_workers=3).sync(repos, 'tskey-auth-1')
+
+    assert set(results.values()) == {'updated'}
+    assert 1 < server.peak <= 3
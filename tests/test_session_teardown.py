@@ -0,0 +1,51 @@
+"""
+Tests for reaping orphaned and stale workflow runs
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import time
+
+from session_teardown import find_reapable_runs
+
+
+class RunsAuth:
+    """Serves a fixed list of runs for every repository"""
+
+    def __init__(self, runs):
+        self.runs = runs
+
+    def list_workflow_runs(self, owner, repo, workflow_file, status=None, max_runs=100):
+        return self.runs
+
+
+def iso(seconds_ago):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - seconds_ago))
+
+
+def test_kept_runs_are_reaped_only_when_too_old():
+    auth = RunsAuth([
+        {'id': 1, 'status': 'in_progress', 'created_at': iso(7200)},
+        {'id': 2, 'status': 'in_progress', 'created_at': iso(60)},
+        {'id': 3, 'status': 'queued', 'created_at': iso(60)},
+        {'id': 4, 'status': 'completed', 'created_at': iso(7200)},
+    ])
+
+    runs = find_reapable_runs(auth, ['me/a'], keep_run_ids={1, 2, 4}, max_age=3600)
+
+    assert runs == [('me/a', 1), ('me/a', 3)]
+
+
+def test_unparseable_created_at_does_not_fail_the_reap():
+    """A run of unknown age is kept if owned and reaped if orphaned"""
+    auth = RunsAuth([
+        {'id': 1, 'status': 'in_progress', 'created_at': '2020-01-20T09:42:40.000-08:00'},
+        {'id': 2, 'status': 'in_progress', 'created_at': 'yesterday'},
+        {'id': 3, 'status': 'in_progress', 'created_at': None},
+        {'id': 4, 'status': 'in_progress'},
+    ])
+
+    runs = find_reapable_runs(auth, ['me/a'], keep_run_ids={1, 2, 3}, max_age=3600)
+
+    assert runs == [('me/a', 1), ('me/a', 4)]
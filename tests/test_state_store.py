@@ -0,0 +1,111 @@
+"""
+Tests for the dashboard state store
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import json
+import time
+
+import pytest
+
+from state_store import STATE_VERSION, StateStore
+
+
+def session(run_id, repo='me/rdp', age=0.0):
+    return {'repo': repo, 'run_id': run_id, 'status': 'in_progress', 'conclusion': None,
+            'html_url': '', 'updated_at': time.time() - age}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(str(tmp_path / 'state.json'))
+
+
+def write_state(store, **overrides):
+    state = {'version': STATE_VERSION, 'saved_at': time.time(), 'settings': {'repo': 'me/rdp'},
+             'sessions': {'1': session(1)}, 'connection_info': ''}
+    state.update(overrides)
+    with open(store.path, 'w', encoding='utf-8') as state_file:
+        json.dump(state, state_file)
+
+
+def test_round_trip(store):
+    store.save({'repo': 'me/rdp'}, {'1': session(1)}, 'info')
+    state = store.load()
+    assert state['settings'] == {'repo': 'me/rdp'}
+    assert list(state['sessions']) == ['1']
+    assert state['connection_info'] == 'info'
+
+
+@pytest.mark.parametrize('content', ['{not json', '[]', '"text"', ''])
+def test_corrupt_file_loads_as_none(store, content):
+    with open(store.path, 'w', encoding='utf-8') as state_file:
+        state_file.write(content)
+    assert store.load() is None
+
+
+def test_malformed_saved_at_loads_as_none(store):
+    write_state(store, saved_at='x')
+    assert store.load() is None
+
+
+def test_malformed_entries_are_dropped(store):
+    bad_sessions = {
+        '1': session(1),
+        '2': {'run_id': 2, 'updated_at': time.time()},  # No repo
+        '3': dict(session(3), updated_at='yesterday'),
+        '4': 'not a session',
+        '5': dict(session(5), run_id='5'),
+    }
+    write_state(store, sessions=bad_sessions, settings={'repo': 'me/rdp', 'pool_repos': 3},
+                connection_info=['x'])
+
+    state = store.load()
+
+    assert list(state['sessions']) == ['1']
+    assert state['settings'] == {'repo': 'me/rdp'}
+    assert state['connection_info'] == ''
+
+
+def test_non_dict_sections_are_replaced(store):
+    write_state(store, sessions=[1, 2], settings='me/rdp')
+    state = store.load()
+    assert state['sessions'] == {}
+    assert state['settings'] == {}
+
+
+def test_oversized_file_is_ignored(tmp_path):
+    store = StateStore(str(tmp_path / 'state.json'), max_bytes=1024)
+    write_state(store, connection_info='x' * 2048)
+    assert store.load() is None
+
+
+def test_save_trims_sessions_to_size_cap(tmp_path):
+    store = StateStore(str(tmp_path / 'state.json'), max_bytes=2048)
+    sessions = {str(i): dict(session(i), html_url='u' * 100, updated_at=time.time() + i)
+                for i in range(50)}
+    store.save({}, sessions)
+
+    state = store.load()
+
+    assert 0 < len(state['sessions']) < 50
+    # The newest sessions are the ones kept
+    assert '49' in state['sessions']
+
+
+def test_save_keeps_most_recent_sessions_up_to_cap(tmp_path):
+    store = StateStore(str(tmp_path / 'state.json'), max_sessions=3)
+    sessions = {str(i): dict(session(i), updated_at=time.time() - 100 + i) for i in range(10)}
+    store.save({}, sessions)
+    assert sorted(store.load()['sessions']) == ['7', '8', '9']
+
+
+def test_expired_state_and_sessions(tmp_path):
+    store = StateStore(str(tmp_path / 'state.json'), max_age=3600)
+    write_state(store, sessions={'1': session(1), '2': session(2, age=7200)})
+    assert list(store.load()['sessions']) == ['1']
+
+    write_state(store, saved_at=time.time() - 7200)
+    assert store.load() is None
@@ -0,0 +1,65 @@
+"""
+Tests for the background task runner
+
+Author: Windows 11 RDP Project
+License: MIT
+"""
+
+import time
+
+from PyQt5.QtCore import QElapsedTimer, QThreadPool, QTimer
+
+from task_runner import TaskRunner
+
+
+def test_event_loop_stays_responsive_with_50_slow_tasks(qapp):
+    """A GUI timer keeps firing on time while 50 blocking tasks run"""
+    runner = TaskRunner(max_concurrent=8, pool=QThreadPool())
+    results = []
+    gaps = []
+
+    clock = QElapsedTimer()
+    tick = QTimer()
+    tick.setInterval(10)
+
+    def on_tick():
+        gaps.append(clock.restart())
+    tick.timeout.connect(on_tick)
+
+    def on_result(value):
+        results.append(value)
+        if len(results) == 50:
+            qapp.quit()
+
+    for i in range(50):
+        runner.submit(lambda ctx, i=i: time.sleep(0.2) or i, on_result=on_result)
+
+    QTimer.singleShot(10000, qapp.quit)  # Safety net if tasks never finish
+    clock.start()
+    tick.start()
+    qapp.exec_()
+    tick.stop()
+
+    assert sorted(results) == list(range(50))
+    # 50 x 0.2 s on 8 threads takes over a second; the loop must not stall
+    assert len(gaps) > 50
+    assert max(gaps) < 100
+
+
+def test_cancelled_task_delivers_no_result(qapp):
+    """Cancelling a running task suppresses its result"""
+    runner = TaskRunner(max_concurrent=1, pool=QThreadPool())
+    outcome = []
+
+    task = runner.submit(
+        lambda ctx: ctx.wait(5) or 'done',
+        on_result=outcome.append,
+        on_finished=qapp.quit
+    )
+    task.signals.cancelled.connect(lambda: outcome.append('cancelled'))
+    QTimer.singleShot(50, task.cancel)
+    QTimer.singleShot(5000, qapp.quit)
+    qapp.exec_()
+
+    assert outcome == ['cancelled']
+    assert runner.active_count() == 0